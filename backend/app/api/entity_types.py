@@ -3,8 +3,14 @@
 基于 GB/T 37964-2019《信息安全技术 个人信息去标识化指南》国家标准设计
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from typing import TypeVar
 
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
+
+from app.core.fast_json import FastJSONResponse
 from app.models.schemas import MessageResponse, ToggleResponse
 from app.services import entity_type_service
 from app.services.entity_type_service import (
@@ -17,7 +23,40 @@ from app.services.entity_type_service import (
     UpdateEntityTypeRequest,
 )
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
+
+_BodyT = TypeVar("_BodyT", bound=BaseModel)
+
+
+def _json_response(model) -> Response:
+    """直接返回 pydantic-core 序列化好的字节，跳过 response_model 的二次校验与 jsonable_encoder。"""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+def _body_error(err: dict) -> dict:
+    err = {**err, "loc": ("body", *err["loc"])}
+    if err["type"] == "json_invalid":
+        # input 是原始请求字节，无法 JSON 序列化；与 FastAPI 自带解析一致置为 {}
+        err["input"] = {}
+    return err
+
+
+async def _parse_body(request: Request, model: type[_BodyT]) -> _BodyT:
+    """写接口直接用 pydantic-core 从原始字节解析+校验请求体，省去 json.loads 再校验 dict 的一轮。
+
+    错误结构与 FastAPI 自带的请求体解析保持一致（空请求体报 missing，坏 JSON 报 json_invalid），均返回 422。
+    """
+    raw = await request.body()
+    if not raw:
+        raise RequestValidationError([{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}])
+    try:
+        return model.model_validate_json(raw)
+    except ValidationError as exc:
+        raise RequestValidationError([_body_error(err) for err in exc.errors(include_url=False)]) from exc
+
+
+def _body_schema(model: type[BaseModel]) -> dict:
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": model.model_json_schema()}}}}
 
 
 @router.post("/custom-types/regex-test", response_model=RegexTestResult)
@@ -26,47 +65,60 @@ async def test_regex(request: RegexTestRequest):
     return entity_type_service.test_regex(request.pattern, request.test_text)
 
 
-@router.get("/custom-types", response_model=EntityTypesResponse)
+@router.get("/custom-types", responses={200: {"model": EntityTypesResponse}})
 async def get_entity_types(
     enabled_only: bool = Query(False, description="是否只返回启用的类型"),
     page: int = Query(1, ge=1, description="页码，从 1 开始"),
     page_size: int = Query(0, ge=0, le=10000, description="每页条数，0=全量返回"),
 ):
     """获取所有实体类型配置（page_size=0 返回全部）"""
-    return entity_type_service.list_types(enabled_only, page, page_size)
+    return Response(
+        content=entity_type_service.get_serialized(enabled_only, page, page_size),
+        media_type="application/json",
+    )
 
 
-@router.get("/custom-types/taxonomy", response_model=TextTaxonomyResponse)
+@router.get("/custom-types/taxonomy", responses={200: {"model": TextTaxonomyResponse}})
 async def get_text_taxonomy():
     """获取文本自定义识别项的 L1/L2 元数据分类树。"""
-    return entity_type_service.get_text_taxonomy()
+    return _json_response(entity_type_service.get_text_taxonomy())
 
 
-@router.get("/custom-types/{type_id}", response_model=EntityTypeConfig)
+@router.get("/custom-types/{type_id}", responses={200: {"model": EntityTypeConfig}})
 async def get_entity_type(type_id: str):
     """获取单个实体类型配置"""
-    result = entity_type_service.get_type(type_id)
-    if result is None:
+    content = entity_type_service.get_type_serialized(type_id)
+    if content is None:
         raise HTTPException(status_code=404, detail="实体类型不存在")
-    return result
+    return Response(content=content, media_type="application/json")
 
 
-@router.post("/custom-types", response_model=EntityTypeConfig)
-async def create_entity_type(request: CreateEntityTypeRequest):
+@router.post(
+    "/custom-types",
+    responses={200: {"model": EntityTypeConfig}},
+    openapi_extra=_body_schema(CreateEntityTypeRequest),
+)
+async def create_entity_type(request: Request):
     """创建新的实体类型"""
-    return entity_type_service.create_type(request)
+    body = await _parse_body(request, CreateEntityTypeRequest)
+    return _json_response(entity_type_service.create_type(body))
 
 
-@router.put("/custom-types/{type_id}", response_model=EntityTypeConfig)
-async def update_entity_type(type_id: str, request: UpdateEntityTypeRequest):
+@router.put(
+    "/custom-types/{type_id}",
+    responses={200: {"model": EntityTypeConfig}},
+    openapi_extra=_body_schema(UpdateEntityTypeRequest),
+)
+async def update_entity_type(type_id: str, request: Request):
     """更新实体类型配置"""
+    body = await _parse_body(request, UpdateEntityTypeRequest)
     try:
-        result = entity_type_service.update_type(type_id, request)
+        result = entity_type_service.update_type(type_id, body)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     if result is None:
         raise HTTPException(status_code=404, detail="实体类型不存在")
-    return result
+    return _json_response(result)
 
 
 @router.delete("/custom-types/{type_id}", response_model=MessageResponse)
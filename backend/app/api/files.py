@@ -16,7 +16,7 @@ import aiofiles
 logger = logging.getLogger(__name__)
 
 
-from fastapi import APIRouter, Body, Depends, File, Form, Header, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Body, Depends, File, Form, Header, HTTPException, Query, Request, UploadFile
 from fastapi.responses import FileResponse, Response
 
 import app.services.file_management_service as _fms
@@ -24,6 +24,7 @@ import app.services.job_management_service as _jms
 from app.api.jobs import get_job_store
 from app.core.audit import audit_log
 from app.core.config import settings
+from app.core.file_validation import ALLOWED_EXTENSION_SET, file_ext
 from app.core.idempotency import check_idempotency, save_idempotency
 from app.models.schemas import (
     APIResponse,
@@ -42,8 +43,8 @@ router = APIRouter()
 
 def validate_file(file: UploadFile) -> None:
     """验证上传的文件"""
-    ext = os.path.splitext(file.filename)[1].lower()
-    if ext not in settings.ALLOWED_EXTENSIONS:
+    ext = file_ext(file.filename)
+    if ext not in ALLOWED_EXTENSION_SET:
         raise HTTPException(
             status_code=400,
             detail=f"不支持的文件类型: {ext}，支持的类型: {settings.ALLOWED_EXTENSIONS}"
@@ -81,7 +82,7 @@ async def list_files(
 
     file_store = _fms.get_file_store()
     filtered_entries: list[tuple[str, dict]] = []
-    for fid, info in file_store.items():
+    for fid, info in file_store.metadata_items():
         if not isinstance(info, dict):
             continue
         if job_file_ids is not None and fid not in job_file_ids:
@@ -219,8 +220,8 @@ async def upload_file(
 
     # 生成唯一文件ID
     file_id = str(uuid.uuid4())
-    file_ext = os.path.splitext(file.filename)[1].lower()
-    stored_filename = f"{file_id}{file_ext}"
+    ext = file_ext(file.filename)
+    stored_filename = f"{file_id}{ext}"
     file_path = os.path.realpath(os.path.join(settings.UPLOAD_DIR, stored_filename))
 
     # 磁盘空间检查
@@ -257,7 +258,7 @@ async def upload_file(
     try:
         response_and_jid = await _fms.process_upload(
             file_path=file_path,
-            file_ext=file_ext,
+            file_ext=ext,
             filename=file.filename,
             file_size=file_size,
             batch_group_id=batch_group_id,
@@ -413,8 +414,8 @@ async def get_file_info(file_id: str):
     return info
 
 
-@router.get("/files/{file_id}/download")
-async def download_file(file_id: str, redacted: bool = False):
+@router.get("/files/{file_id}/download", response_class=FileResponse)
+async def download_file(request: Request, file_id: str, redacted: bool = False):
     """
     下载文件
 
@@ -441,14 +442,33 @@ async def download_file(file_id: str, redacted: bool = False):
     if not _fms.safe_path_in_dir(file_path, expected_dir):
         raise HTTPException(status_code=403, detail="禁止访问该路径")
 
-    if not os.path.exists(file_path):
+    # 只 stat 一次：既判断存在，又交给 FileResponse 复用（Starlette 不再重复 stat）
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
         raise HTTPException(status_code=404, detail="文件不存在")
 
-    return FileResponse(
+    # FileResponse 已支持 Range 分段与 ETag；这里再补上条件请求：
+    # 内容未变时返回 304，浏览器复用本地副本。文档含敏感信息，只允许私有缓存且每次回源校验
+    response = FileResponse(
         path=file_path,
         filename=filename,
         media_type="application/octet-stream",
+        stat_result=stat_result,
+        headers={"Cache-Control": "private, no-cache"},
     )
+    etag = response.headers.get("etag")
+    if etag and _etag_matches(etag, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return response
+
+
+def _etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """If-None-Match 弱比较：忽略 W/ 前缀，"*" 匹配任意现存表示。"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
 
 
 @router.get("/files/{file_id}/page-image")
@@ -482,9 +502,8 @@ async def get_page_image(file_id: str, page: int = 1, redacted: bool = False):
 
     ft = str(snapshot.get("file_type", "")).lower()
     if ft in ("pdf", "pdf_scanned"):
-        from app.services.file_parser import FileParser
-        parser = FileParser()
-        image_bytes = await parser.get_pdf_page_image(file_path, page)
+        from app.services.file_processing_service import _get_parser
+        image_bytes = await _get_parser().get_pdf_page_image(file_path, page)
         return RawResponse(content=image_bytes, media_type="image/png")
 
     if ft in ("image", "jpg", "jpeg", "png"):
@@ -11,9 +11,11 @@ logger = logging.getLogger(__name__)
 
 
 from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import Response
 
 import app.services.redaction_orchestrator as _orch
 from app.core.audit import audit_log
+from app.core.fast_json import dumps_bytes
 from app.core.idempotency import check_idempotency, save_idempotency
 from app.models.schemas import (
     CompareData,
@@ -145,16 +147,23 @@ async def detect_sensitive_regions(
         raise HTTPException(status_code=404, detail=str(exc))
 
 
-@router.get("/redaction/entity-types", response_model=EntityTypeListResponse)
+# 内置参考列表是静态内容：启动时序列化一次，并允许浏览器缓存
+# 路由在鉴权之后，只允许浏览器私有缓存，不让共享代理/CDN 存储
+_STATIC_CACHE_HEADERS = {"Cache-Control": "private, max-age=3600"}
+_ENTITY_TYPES_BODY = dumps_bytes({"entity_types": _orch.get_entity_types_list()})
+_REPLACEMENT_MODES_BODY = dumps_bytes({"replacement_modes": _orch.get_replacement_modes_list()})
+
+
+@router.get("/redaction/entity-types", responses={200: {"model": EntityTypeListResponse}})
 async def get_entity_types():
     """获取支持的实体类型列表"""
-    return {"entity_types": _orch.get_entity_types_list()}
+    return Response(content=_ENTITY_TYPES_BODY, media_type="application/json", headers=_STATIC_CACHE_HEADERS)
 
 
-@router.get("/redaction/replacement-modes", response_model=ReplacementModeListResponse)
+@router.get("/redaction/replacement-modes", responses={200: {"model": ReplacementModeListResponse}})
 async def get_replacement_modes():
     """获取支持的替换模式列表"""
-    return {"replacement_modes": _orch.get_replacement_modes_list()}
+    return Response(content=_REPLACEMENT_MODES_BODY, media_type="application/json", headers=_STATIC_CACHE_HEADERS)
 
 
 @router.get("/redaction/{file_id}/report", response_model=RedactionReport)
@@ -6,6 +6,7 @@
 
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
 
 from app.services import pipeline_service
 from app.services.pipeline_service import (
@@ -17,10 +18,13 @@ from app.services.pipeline_service import (
 router = APIRouter()
 
 
-@router.get("/vision-pipelines", response_model=list[PipelineConfig])
+@router.get("/vision-pipelines", responses={200: {"model": list[PipelineConfig]}})
 async def get_pipelines(enabled_only: bool = False):
     """获取所有 Pipeline 配置"""
-    return pipeline_service.list_pipelines(enabled_only)
+    return Response(
+        content=pipeline_service.get_pipelines_serialized(enabled_only),
+        media_type="application/json",
+    )
 
 
 @router.get("/vision-pipelines/{mode}", response_model=PipelineConfig)
@@ -41,13 +45,13 @@ async def toggle_pipeline(mode: str):
     return {"enabled": enabled}
 
 
-@router.get("/vision-pipelines/{mode}/types", response_model=list[PipelineTypeConfig])
+@router.get("/vision-pipelines/{mode}/types", responses={200: {"model": list[PipelineTypeConfig]}})
 async def get_pipeline_types(mode: str, enabled_only: bool = True):
     """获取指定 Pipeline 的类型配置"""
-    result = pipeline_service.get_pipeline_types(mode, enabled_only)
-    if result is None:
+    content = pipeline_service.get_pipeline_types_serialized(mode, enabled_only)
+    if content is None:
         raise HTTPException(status_code=404, detail="Pipeline 不存在")
-    return result
+    return Response(content=content, media_type="application/json")
 
 
 @router.post("/vision-pipelines/{mode}/types", response_model=PipelineTypeConfig)
@@ -65,7 +69,7 @@ async def update_pipeline_type(mode: str, type_id: str, request: PipelineTypeCon
     """更新 Pipeline 类型"""
     updated, error = pipeline_service.update_pipeline_type(mode, type_id, request)
     if updated is None:
-        code = 404
+        code = 400 if error == "类型 ID 已存在" else 404
         raise HTTPException(status_code=code, detail=error)
     return updated
 
@@ -203,6 +203,8 @@ class Settings(BaseSettings):
     HAS_NER_BUILTIN_GUIDANCE_ENABLED: bool = False
     HAS_NER_CACHE_TTL_SEC: float = 300.0
     HAS_NER_CACHE_MAX_ITEMS: int = 256
+    # llama.cpp 运行时：请求带 cache_prompt，复用同一类型清单/说明前缀的 KV cache
+    HAS_NER_CACHE_PROMPT: bool = True
     # Keep HaS Text OCR requests bounded. Scanned PDFs can produce coarse page
     # aggregates; HaS still decides semantics, but the backend should not send
     # unbounded OCR text into a cold local NER queue.
@@ -1,5 +1,6 @@
 """Unified error response handling."""
 from fastapi import Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -54,5 +55,6 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         422,
         "VALIDATION_ERROR",
         "请求参数校验失败",
-        {"errors": exc.errors()},
+        # 与 FastAPI 默认处理器一致：ctx 里可能带 ValueError 等对象，先转成可序列化结构
+        {"errors": jsonable_encoder(exc.errors())},
     )
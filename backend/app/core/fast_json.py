@@ -0,0 +1,40 @@
+"""
+JSON 编码加速：安装了 orjson 时使用 orjson，否则回退到标准库 json。
+"""
+
+import json
+import logging
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于部署环境
+    orjson = None
+    logger.debug("orjson not installed, JSON encoding uses stdlib json")
+
+
+def dumps_bytes(content: Any) -> bytes:
+    """紧凑 JSON 编码为 UTF-8 字节（非 ASCII 字符原样输出，与 JSONResponse 一致）。"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse 的 orjson 版本；可作为路由的 default_response_class。"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
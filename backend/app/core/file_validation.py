@@ -6,8 +6,6 @@
 """
 from __future__ import annotations
 
-import os
-
 from app.core.config import settings
 from app.models.schemas import FileType
 
@@ -31,11 +29,37 @@ MAGIC_BYTES: dict[bytes, set[str]] = {
 # Text-like extensions that have no fixed magic bytes
 TEXT_EXTENSIONS: frozenset[str] = frozenset({".txt", ".md", ".rtf", ".html", ".htm"})
 
+IMAGE_EXTENSIONS: frozenset[str] = frozenset(
+    {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp", ".tif", ".tiff"}
+)
+
+# Extension → FileType，一次哈希查找代替 if/elif 链
+_EXT_TO_TYPE: dict[str, FileType] = {
+    ".doc": FileType.DOC,
+    ".docx": FileType.DOCX,
+    ".pdf": FileType.PDF,
+    **dict.fromkeys(TEXT_EXTENSIONS, FileType.TXT),
+    **dict.fromkeys(IMAGE_EXTENSIONS, FileType.IMAGE),
+}
+
+ALLOWED_EXTENSION_SET: frozenset[str] = frozenset(settings.ALLOWED_EXTENSIONS)
+
 
 # ---------------------------------------------------------------------------
 # Validation helpers
 # ---------------------------------------------------------------------------
 
+def file_ext(name: str) -> str:
+    """小写扩展名（含点），语义同 ``os.path.splitext(name)[1].lower()``，只做一次 rpartition。"""
+    stem, dot, ext = name.rpartition(".")
+    if not dot or "/" in ext or "\\" in ext:
+        return ""
+    # 隐藏文件（".env"、"dir/.pdf"）与 splitext 一样视为无扩展名
+    if not stem.rpartition("/")[2].rpartition("\\")[2].lstrip("."):
+        return ""
+    return "." + ext.lower()
+
+
 def validate_magic_bytes(file_path: str, ext: str) -> bool:
     """Validate file magic bytes match *ext*. Reject unknown binary signatures.
 
@@ -59,24 +83,13 @@ def validate_magic_bytes(file_path: str, ext: str) -> bool:
 
 def validate_extension(ext: str) -> bool:
     """Check whether *ext* is in the server's allowed-extension list."""
-    return ext in settings.ALLOWED_EXTENSIONS
+    return ext in ALLOWED_EXTENSION_SET
 
 
 def get_file_type(filename: str) -> FileType | None:
     """Infer :class:`FileType` from file extension. Returns ``None`` for
     unsupported types (caller should raise an appropriate error)."""
-    ext = os.path.splitext(filename)[1].lower()
-    if ext == ".doc":
-        return FileType.DOC
-    elif ext == ".docx":
-        return FileType.DOCX
-    elif ext in (".txt", ".md", ".rtf", ".html", ".htm"):
-        return FileType.TXT
-    elif ext == ".pdf":
-        return FileType.PDF
-    elif ext in (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp", ".tif", ".tiff"):
-        return FileType.IMAGE
-    return None
+    return _EXT_TO_TYPE.get(file_ext(filename))
 
 
 def safe_path_in_dir(file_path: str, allowed_dir: str) -> bool:
@@ -1,10 +1,19 @@
 import json
+import logging
 import os
 from enum import Enum
 from typing import Any
 
 import aiofiles
 
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于部署环境
+    orjson = None
+    logger.debug("orjson not installed, persistence uses stdlib json")
+
 
 def to_jsonable(value: Any) -> Any:
     if hasattr(value, "model_dump"):
@@ -18,29 +27,100 @@ def to_jsonable(value: Any) -> Any:
     return value
 
 
+def _orjson_default(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    raise TypeError
+
+
+def dumps_pretty(data: Any) -> bytes:
+    """两空格缩进、非 ASCII 原样输出的 JSON 字节；装了 orjson 时直接编码，免去 to_jsonable 整树拷贝。"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data,
+                default=_orjson_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            pass
+    return json.dumps(to_jsonable(data), ensure_ascii=False, indent=2).encode("utf-8")
+
+
 def load_json(path: str, default: Any | None = None) -> Any:
     if not path or not os.path.exists(path):
         return default
     try:
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            raw = f.read()
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
     except (json.JSONDecodeError, OSError, ValueError):
         return default
 
 
-def save_json(path: str, data: Any) -> None:
-    """同步写入 JSON（用于启动阶段等非异步上下文）。"""
+def save_json(path: str, data: Any, *, skip_unchanged: bool = False) -> bool:
+    """同步写入 JSON（用于启动阶段等非异步上下文），返回是否实际写盘。
+
+    skip_unchanged=True 时先比对磁盘上的字节，内容相同则跳过 fsync + rename。
+    """
     if not path:
-        return
+        return False
+    content = dumps_pretty(data)
+    if skip_unchanged:
+        try:
+            with open(path, "rb") as f:
+                if f.read() == content:
+                    return False
+        except OSError:
+            pass
     directory = os.path.dirname(path)
     if directory:
         os.makedirs(directory, exist_ok=True)
     tmp_path = f"{path}.tmp"
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(to_jsonable(data), f, ensure_ascii=False, indent=2)
+    with open(tmp_path, "wb") as f:
+        f.write(content)
         f.flush()
         os.fsync(f.fileno())
     os.replace(tmp_path, path)
+    return True
+
+
+def append_jsonl(path: str, record: Any) -> int:
+    """追加一行紧凑 JSON 并 fsync，返回追加后的文件大小（供调用方决定何时压缩）。"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if orjson is not None:
+        line = orjson.dumps(record, default=_orjson_default) + b"\n"
+    else:
+        line = (json.dumps(to_jsonable(record), ensure_ascii=False) + "\n").encode("utf-8")
+    with open(path, "ab") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def load_jsonl(path: str) -> list[Any]:
+    """读取 JSONL；无法解析的行（如崩溃时写了一半的末行）跳过。"""
+    if not path or not os.path.exists(path):
+        return []
+    records: list[Any] = []
+    try:
+        with open(path, "rb") as f:
+            for raw in f:
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    records.append(orjson.loads(raw) if orjson is not None else json.loads(raw))
+                except ValueError:
+                    logger.warning("Skipping unreadable line in %s", path)
+    except OSError:
+        return []
+    return records
 
 
 async def save_json_async(path: str, data: Any) -> None:
@@ -51,8 +131,8 @@ async def save_json_async(path: str, data: Any) -> None:
     if directory:
         os.makedirs(directory, exist_ok=True)
     tmp_path = f"{path}.tmp"
-    content = json.dumps(to_jsonable(data), ensure_ascii=False, indent=2)
-    async with aiofiles.open(tmp_path, "w", encoding="utf-8") as f:
+    content = dumps_pretty(data)
+    async with aiofiles.open(tmp_path, "wb") as f:
         await f.write(content)
         await f.flush()
         # aiofiles 不直接支持 fsync，在非关键路径可接受
@@ -1,6 +1,7 @@
 """Retry utility with exponential backoff for HTTP microservice calls."""
 import asyncio
 import logging
+import random
 from collections.abc import Awaitable, Callable
 from typing import TypeVar
 
@@ -9,6 +10,11 @@ logger = logging.getLogger(__name__)
 T = TypeVar("T")
 
 
+def _backoff_delay(attempt: int, base_delay: float, max_delay: float, jitter: bool) -> float:
+    delay = min(base_delay * (2 ** attempt), max_delay)
+    return random.uniform(0, delay) if jitter else delay
+
+
 async def retry_async(
     fn: Callable[..., Awaitable[T]],
     *args,
@@ -16,6 +22,8 @@ async def retry_async(
     base_delay: float = 1.0,
     max_delay: float = 10.0,
     retryable_exceptions: tuple = (Exception,),
+    retry_if: Callable[[BaseException], bool] | None = None,
+    jitter: bool = False,
     **kwargs,
 ) -> T:
     """
@@ -27,15 +35,19 @@ async def retry_async(
         base_delay: Initial delay in seconds
         max_delay: Maximum delay cap in seconds
         retryable_exceptions: Tuple of exception types to retry on
+        retry_if: Optional predicate; matching exceptions it rejects are raised immediately
+        jitter: Use "full jitter" (uniform 0..delay) so concurrent callers do not retry in lockstep
     """
     last_exc = None
     for attempt in range(max_retries + 1):
         try:
             return await fn(*args, **kwargs)
         except retryable_exceptions as e:
+            if retry_if is not None and not retry_if(e):
+                raise
             last_exc = e
             if attempt < max_retries:
-                delay = min(base_delay * (2 ** attempt), max_delay)
+                delay = _backoff_delay(attempt, base_delay, max_delay, jitter)
                 logger.warning(
                     "Retry %d/%d for %s after %.1fs: %s",
                     attempt + 1, max_retries, fn.__name__, delay, e,
@@ -53,6 +65,8 @@ def retry_sync(
     base_delay: float = 1.0,
     max_delay: float = 10.0,
     retryable_exceptions: tuple = (Exception,),
+    retry_if: Callable[[BaseException], bool] | None = None,
+    jitter: bool = False,
     **kwargs,
 ) -> T:
     """
@@ -64,6 +78,8 @@ def retry_sync(
         base_delay: Initial delay in seconds
         max_delay: Maximum delay cap in seconds
         retryable_exceptions: Tuple of exception types to retry on
+        retry_if: Optional predicate; matching exceptions it rejects are raised immediately
+        jitter: Use "full jitter" (uniform 0..delay) so concurrent callers do not retry in lockstep
     """
     import time
 
@@ -72,9 +88,11 @@ def retry_sync(
         try:
             return fn(*args, **kwargs)
         except retryable_exceptions as e:
+            if retry_if is not None and not retry_if(e):
+                raise
             last_exc = e
             if attempt < max_retries:
-                delay = min(base_delay * (2 ** attempt), max_delay)
+                delay = _backoff_delay(attempt, base_delay, max_delay, jitter)
                 logger.warning(
                     "Retry %d/%d for %s after %.1fs: %s",
                     attempt + 1, max_retries, fn.__name__, delay, e,
@@ -93,3 +111,21 @@ RETRYABLE_HTTPX = (
     ConnectionError,
     OSError,
 )
+
+_TRANSIENT_HTTP_STATUS = frozenset({429, 502, 503, 504})
+_RATE_LIMIT_MARKERS = ("rate limit", "too many requests", "quota")
+
+
+def is_transient_http_error(exc: BaseException) -> bool:
+    """连接/超时错误，或 429/5xx 网关类、限流类 HTTP 响应视为可重试；其他 4xx 直接失败。"""
+    import httpx
+
+    if isinstance(exc, httpx.HTTPStatusError):
+        if exc.response.status_code in _TRANSIENT_HTTP_STATUS:
+            return True
+        try:
+            body = exc.response.text.lower()
+        except Exception:
+            return False
+        return any(marker in body for marker in _RATE_LIMIT_MARKERS)
+    return isinstance(exc, RETRYABLE_HTTPX)
@@ -10,10 +10,19 @@ compile+probe and finditer, since Python's ``re`` module does not
 natively support cancellation.
 """
 
+import functools
 import multiprocessing
+import os
 import re
-from concurrent.futures import ProcessPoolExecutor
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
 from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import regex as _regex_engine
+except ImportError:  # pragma: no cover - depends on the deployment
+    _regex_engine = None
 
 
 class RegexTimeoutError(ValueError):
@@ -34,27 +43,92 @@ def _compile_and_probe(pattern: str) -> re.Pattern:
     return compiled
 
 
+@functools.lru_cache(maxsize=256)
+def _worker_compile(pattern_str: str, flags: int):
+    """Compile inside the worker, preferring the ``regex`` module when installed.
+
+    ``regex`` (VERSION0) is a drop-in for ``re`` with the same flag values and
+    match semantics, and its engine handles large CJK character classes
+    faster.  Patterns it rejects still go through stdlib ``re``.
+    """
+    if _regex_engine is not None:
+        try:
+            return _regex_engine.compile(pattern_str, flags)
+        except Exception:
+            pass
+    return re.compile(pattern_str, flags)
+
+
 def _finditer_in_process(
     pattern_str: str, flags: int, text: str
 ) -> list[tuple[str, int, int]]:
     """Run finditer in a subprocess and return serialisable tuples."""
-    compiled = re.compile(pattern_str, flags)
+    compiled = _worker_compile(pattern_str, flags)
     return [
         (m.group(), m.start(), m.end()) for m in compiled.finditer(text)
     ]
 
 
+def _search_in_process(pattern_str: str, flags: int, text: str) -> bool:
+    """Return whether the pattern matches anywhere in *text*."""
+    return _worker_compile(pattern_str, flags).search(text) is not None
+
+
+def _finditer_batch_in_process(
+    patterns: list[tuple[str, int]], text: str
+) -> list[list[tuple[str, int, int]]]:
+    """Run several patterns over one *text* inside a single worker call."""
+    return [_finditer_in_process(p, flags, text) for p, flags in patterns]
+
+
 # Reusable process pool (spawned once, avoids per-call fork overhead).
-# max_workers=1 is fine — only one probe runs at a time per call.
+# Several workers let concurrent documents (and the per-type patterns of one
+# document, see safe_finditer_many) run on separate cores instead of queueing
+# behind a single process.
+_POOL_WORKERS = max(1, min(4, os.cpu_count() or 1))
 _pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
 
 
 def _get_pool() -> ProcessPoolExecutor:
     global _pool
-    if _pool is None:
-        ctx = multiprocessing.get_context("spawn")
-        _pool = ProcessPoolExecutor(max_workers=1, mp_context=ctx)
-    return _pool
+    with _pool_lock:
+        if _pool is None:
+            ctx = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=_POOL_WORKERS, mp_context=ctx)
+        return _pool
+
+
+def _submit(fn, *args) -> tuple[ProcessPoolExecutor, Future]:
+    """Submit to the shared pool, moving to a fresh one if it was retired meanwhile."""
+    while True:
+        pool = _get_pool()
+        try:
+            return pool, pool.submit(fn, *args)
+        except RuntimeError:
+            # 取池与提交之间被并发超时退役（或池已损坏）：换新池再提交
+            _kill_and_replace_pool(pool)
+
+
+def _run_in_pool(fn, *args, timeout: float):
+    """Run ``fn(*args)`` in a worker with a wall-clock *timeout*.
+
+    On timeout the pool is retired and ``FuturesTimeoutError`` propagates.
+    A worker that died underneath the call (``BrokenProcessPool``) gets one
+    resubmission on a fresh pool.
+    """
+    for attempt in range(2):
+        pool, future = _submit(fn, *args)
+        try:
+            return future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            future.cancel()
+            _kill_and_replace_pool(pool)
+            raise
+        except BrokenProcessPool:
+            _kill_and_replace_pool(pool)
+            if attempt:
+                raise
 
 
 def safe_compile(pattern: str, timeout: float = 2.0) -> re.Pattern:
@@ -69,14 +143,9 @@ def safe_compile(pattern: str, timeout: float = 2.0) -> re.Pattern:
     compiled = re.compile(pattern, re.IGNORECASE)
 
     # Then: probe for catastrophic backtracking in a subprocess
-    pool = _get_pool()
-    future = pool.submit(_compile_and_probe, pattern)
     try:
-        future.result(timeout=timeout)
+        _run_in_pool(_compile_and_probe, pattern, timeout=timeout)
     except FuturesTimeoutError:
-        future.cancel()
-        # Kill and replace the pool so the stuck worker is terminated
-        _kill_and_replace_pool()
         raise RegexTimeoutError(
             f"Regex compile+probe timed out after {timeout}s — "
             f"pattern may cause catastrophic backtracking (ReDoS): {pattern!r}"
@@ -111,15 +180,9 @@ def safe_finditer(
     Returns a list of lightweight match-like objects.
     Raises ``RegexTimeoutError`` on timeout.
     """
-    pool = _get_pool()
-    future = pool.submit(
-        _finditer_in_process, compiled.pattern, compiled.flags, text
-    )
     try:
-        raw = future.result(timeout=timeout)
+        raw = _run_in_pool(_finditer_in_process, compiled.pattern, compiled.flags, text, timeout=timeout)
     except FuturesTimeoutError:
-        future.cancel()
-        _kill_and_replace_pool()
         raise RegexTimeoutError(
             f"Regex finditer timed out after {timeout}s — "
             f"pattern may cause catastrophic backtracking (ReDoS)"
@@ -127,9 +190,80 @@ def safe_finditer(
     return [_MatchProxy(t, s, e) for t, s, e in raw]
 
 
-def _kill_and_replace_pool() -> None:
-    """Shut down the stuck process pool and create a fresh one."""
+def safe_search(compiled: re.Pattern, text: str, timeout: float = 5.0) -> bool:
+    """Run ``compiled.search(text)`` with a wall-clock *timeout*.
+
+    Returns ``True`` when there is at least one match.
+    Raises ``RegexTimeoutError`` on timeout.
+    """
+    try:
+        return _run_in_pool(_search_in_process, compiled.pattern, compiled.flags, text, timeout=timeout)
+    except FuturesTimeoutError:
+        raise RegexTimeoutError(
+            f"Regex search timed out after {timeout}s — "
+            f"pattern may cause catastrophic backtracking (ReDoS)"
+        )
+
+
+def safe_finditer_many(
+    compiled_list: list[re.Pattern], text: str, timeout: float = 5.0
+) -> list[list | None]:
+    """Run several patterns over the same *text* in parallel worker processes.
+
+    Returns one match list per pattern, in order; ``None`` marks a pattern
+    that exceeded its *timeout*.  Patterns are split into one batch per
+    worker so *text* is pickled once per worker rather than once per
+    pattern.  Batches still pending when the deadline passes may hold a
+    stuck pattern, so their patterns are retried one by one on a fresh pool
+    before being given up on; so are batches whose worker died.
+    """
+    if not compiled_list:
+        return []
+    n_batches = min(len(compiled_list), _POOL_WORKERS)
+    batches = [list(range(i, len(compiled_list), n_batches)) for i in range(n_batches)]
+    submitted = [
+        _submit(
+            _finditer_batch_in_process,
+            [(compiled_list[i].pattern, compiled_list[i].flags) for i in batch],
+            text,
+        )
+        for batch in batches
+    ]
+    _, pending = wait([future for _, future in submitted], timeout=timeout * len(batches[0]))
+    for pool, future in submitted:
+        if future in pending:
+            future.cancel()
+            _kill_and_replace_pool(pool)
+
+    results: list[list | None] = [None] * len(compiled_list)
+    for batch, (_, future) in zip(batches, submitted, strict=True):
+        try:
+            raw_batch = None if future in pending else future.result()
+        except BrokenProcessPool:
+            raw_batch = None
+        if raw_batch is None:
+            for i in batch:
+                try:
+                    results[i] = safe_finditer(compiled_list[i], text, timeout=timeout)
+                except RegexTimeoutError:
+                    results[i] = None
+            continue
+        for i, raw in zip(batch, raw_batch, strict=True):
+            results[i] = [_MatchProxy(t, s, e) for t, s, e in raw]
+    return results
+
+
+def _kill_and_replace_pool(pool: ProcessPoolExecutor) -> None:
+    """Retire *pool* so later calls get a fresh one.
+
+    Other callers' futures already queued or running on it are left to
+    finish rather than cancelled: the pool is shared, and one request's
+    stuck pattern must not abort everyone else's in-flight work.
+    """
     global _pool
-    if _pool is not None:
-        _pool.shutdown(wait=False, cancel_futures=True)
+    with _pool_lock:
+        if _pool is not pool:
+            # 已被并发调用退役过
+            return
         _pool = None
+    pool.shutdown(wait=False)
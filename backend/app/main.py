@@ -23,6 +23,7 @@ from app.api import safety as safety_api
 from app.core.auth import require_auth
 from app.core.config import settings
 from app.core.errors import AppError, app_error_handler, http_exception_handler, validation_exception_handler
+from app.core.fast_json import FastJSONResponse
 from app.core.gpu_memory import query_gpu_memory as _query_gpu_memory
 from app.core.gpu_memory import query_gpu_processes as _query_gpu_processes
 from app.core.health_checks import check_has_ner_health, check_ocr_health_sync, check_service_health_sync
@@ -48,7 +49,7 @@ def _storage_files() -> list[tuple[str, str]]:
 
 def _known_file_store_paths(file_store) -> set[str]:
     known_paths: set[str] = set()
-    snapshot = dict(file_store.items())
+    snapshot = dict(file_store.metadata_items())
     for info in snapshot.values():
         if not isinstance(info, dict):
             continue
@@ -261,6 +262,10 @@ async def lifespan(app: FastAPI):
             await t
         except (asyncio.CancelledError, Exception):
             pass
+    from app.services.model_config_service import close_http_client
+    from app.services.pipeline_service import flush_pipelines
+    await close_http_client()
+    flush_pipelines()
     logger.info("Shutdown complete.")
 
 
@@ -272,6 +277,8 @@ app = FastAPI(
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
     lifespan=lifespan,
+    # 所有 JSON 路由默认走 orjson（未安装时回退标准库），大列表接口序列化更快
+    default_response_class=FastJSONResponse,
 )
 
 app.add_exception_handler(AppError, app_error_handler)
@@ -12,8 +12,8 @@ __all__ = [
 
 
 class ModelConfig(BaseModel):
-    """模型配置"""
-    model_config = ConfigDict(protected_namespaces=())
+    """模型配置（不可变：修改一律 model_copy(update=...)，缓存中的实例可安全共享）"""
+    model_config = ConfigDict(protected_namespaces=(), frozen=True)
 
     id: str = Field(..., description="配置ID")
     name: str = Field(..., description="配置名称")
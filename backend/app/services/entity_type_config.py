@@ -0,0 +1,169 @@
+"""
+实体类型配置模型与预置清单加载
+
+只依赖 pydantic 与预置 JSON，导入时不读写运行时数据目录；
+构建期脚本（scripts/build_preset.py）只导入本模块即可生成预置 pickle 产物。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os as _os
+import pickle
+import re
+import sys
+from functools import lru_cache
+
+import pydantic
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter
+
+from app.models.type_mapping import TYPE_ID_ALIASES
+
+logger = logging.getLogger(__name__)
+
+# 单个模式的长度上限；超长模式编译后的状态表可能很大，直接拒绝
+_MAX_PATTERN_LENGTH = 2000
+
+
+@lru_cache(maxsize=512)
+def compile_entity_pattern(pattern: str) -> re.Pattern | None:
+    """编译实体类型正则（与 safe_compile 相同的 IGNORECASE 语义），相同模式共享同一对象。
+
+    语法错误或超出长度上限返回 None，由调用方决定跳过或回退。
+    缓存最多保留 512 个编译结果，内存占用有界。
+    """
+    if not pattern or len(pattern) > _MAX_PATTERN_LENGTH:
+        return None
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        return None
+
+
+@lru_cache(maxsize=512)
+def split_tag_template(tag_template: str) -> tuple[str, ...]:
+    """把标签模板按 {index} 预先切分成字面量片段，渲染时只需 join。"""
+    return tuple(tag_template.split("{index}"))
+
+
+_INTERNED_FIELDS = ("id", "color", "data_domain", "generic_target", "tag_template")
+
+
+class EntityTypeConfig(BaseModel):
+    """Entity type config using the maintained L1/L2/L3 taxonomy."""
+    # 不可变：修改一律通过 model_copy(update=...) 生成新实例再写回 entity_types_db
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    id: str = Field(..., description="Unique type id")
+    name: str = Field(..., description="Display name")
+    data_domain: str = Field(default="custom_extension", description="L1 data domain")
+    generic_target: str | None = Field(default=None, description="L2 generic target for L3 types")
+    entity_type_ids: list[str] = Field(default_factory=list, description="L3 entity types covered by a L2 generic target")
+    linkage_groups: list[str] = Field(default_factory=list, description="Coreference/linkage capability groups")
+    coref_enabled: bool = Field(default=False, description="Whether group-based coreference is enabled")
+    default_enabled: bool = Field(default=False, description="Whether selected by the generic default")
+    description: str | None = Field(None, description="Semantic guidance for model recognition")
+    examples: list[str] = Field(default_factory=list, description="Example texts")
+    color: str = Field(default="#6B7280", description="Display color")
+    regex_pattern: str | None = Field(None, description="Optional regex fallback")
+    use_llm: bool = Field(default=True, description="Whether semantic recognition is enabled")
+    enabled: bool = Field(default=True, description="Whether the type is enabled")
+    order: int = Field(default=100, description="Sort order")
+    tag_template: str | None = Field(None, description="Structured replacement tag template")
+
+    _compiled: re.Pattern | None = PrivateAttr(None)
+
+    def model_post_init(self, __context) -> None:
+        self._intern_fields()
+
+    def __setstate__(self, state) -> None:
+        # 从预置 pickle 产物恢复时不经过 model_post_init，这里补做驻留
+        super().__setstate__(state)
+        self._intern_fields()
+
+    def _intern_fields(self) -> None:
+        # id、颜色、L1/L2 取值和标签模板在几十个类型间大量重复或被频繁当作键比较，驻留后共享同一字符串对象
+        for name in _INTERNED_FIELDS:
+            value = self.__dict__.get(name)
+            if isinstance(value, str):
+                self.__dict__[name] = sys.intern(value)
+
+    @property
+    def compiled_regex(self) -> re.Pattern | None:
+        """regex_pattern 的编译结果；首次访问时才编译（启动时不预编译全部模式），模式变化后重新编译。"""
+        pattern = str(self.regex_pattern or "").strip()
+        compiled = self._compiled
+        if not pattern:
+            return None
+        if compiled is None or compiled.pattern != pattern:
+            compiled = compile_entity_pattern(pattern)
+            self._compiled = compiled
+        return compiled
+
+    def render_tag(self, index: int) -> str | None:
+        """渲染结构化替换标签，{index} 填三位序号；未配置模板时返回 None。"""
+        if not self.tag_template:
+            return None
+        return f"{index:03d}".join(split_tag_template(self.tag_template))
+
+
+# ── 预置类型 ──────────────────────────────────────────────
+
+_PRESET_JSON_PATH = _os.path.join(
+    _os.path.dirname(__file__), "..", "..", "config", "preset_entity_types.json"
+)
+# 预置清单直接由 pydantic-core 从 JSON 字节解析+校验，不经过中间 dict
+_ENTITY_TYPES_ADAPTER = TypeAdapter(dict[str, EntityTypeConfig])
+
+
+# 构建期产物（scripts/build_preset.py 生成）：已校验的预置模型直接 pickle。
+# 产物键覆盖源 JSON、EntityTypeConfig 的字段结构与 pydantic 版本，任一变化都回退到 JSON 校验
+_PRESET_PICKLE_PATH = _os.path.splitext(_PRESET_JSON_PATH)[0] + ".pkl"
+
+
+def _preset_cache_key(raw: bytes) -> str:
+    digest = hashlib.sha256(raw)
+    digest.update(pydantic.VERSION.encode("utf-8"))
+    digest.update(json.dumps(EntityTypeConfig.model_json_schema(), sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _load_preset_pickle(cache_key: str, path: str = _PRESET_PICKLE_PATH) -> dict[str, EntityTypeConfig] | None:
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logger.debug("Preset pickle unusable, falling back to JSON: %s", exc)
+        return None
+    if not isinstance(payload, dict) or payload.get("cache_key") != cache_key:
+        return None
+    return payload.get("types")
+
+
+def load_preset_entity_types() -> dict[str, EntityTypeConfig]:
+    try:
+        with open(_PRESET_JSON_PATH, "rb") as f:
+            raw = f.read()
+    except OSError:
+        return {}
+    presets = _load_preset_pickle(_preset_cache_key(raw))
+    if presets is None:
+        presets = _ENTITY_TYPES_ADAPTER.validate_json(raw)
+    return {k: v for k, v in presets.items() if k not in TYPE_ID_ALIASES}
+
+
+def build_preset_artifact(path: str = _PRESET_PICKLE_PATH) -> int:
+    """校验预置 JSON 并写出 pickle 产物，返回类型数量。"""
+    with open(_PRESET_JSON_PATH, "rb") as f:
+        raw = f.read()
+    presets = _ENTITY_TYPES_ADAPTER.validate_json(raw)
+    payload = {"cache_key": _preset_cache_key(raw), "types": presets}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=5)
+    _os.replace(tmp_path, path)
+    return len(presets)
@@ -5,9 +5,15 @@
 
 from __future__ import annotations
 
+import logging
 import os as _os
 import re
-import uuid
+import sys
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from itertools import compress
+from types import MappingProxyType
 
 from pydantic import BaseModel, Field, model_validator
 
@@ -15,28 +21,11 @@ from app.core.config import settings
 from app.core.persistence import load_json, save_json
 from app.core.safe_regex import RegexTimeoutError, safe_compile, safe_finditer
 from app.models.type_mapping import TYPE_ID_ALIASES, canonical_type_id
+from app.services.entity_type_config import EntityTypeConfig, load_preset_entity_types
 
-# ── 数据模型 ──────────────────────────────────────────────
-
-class EntityTypeConfig(BaseModel):
-    """Entity type config using the maintained L1/L2/L3 taxonomy."""
-    id: str = Field(..., description="Unique type id")
-    name: str = Field(..., description="Display name")
-    data_domain: str = Field(default="custom_extension", description="L1 data domain")
-    generic_target: str | None = Field(default=None, description="L2 generic target for L3 types")
-    entity_type_ids: list[str] = Field(default_factory=list, description="L3 entity types covered by a L2 generic target")
-    linkage_groups: list[str] = Field(default_factory=list, description="Coreference/linkage capability groups")
-    coref_enabled: bool = Field(default=False, description="Whether group-based coreference is enabled")
-    default_enabled: bool = Field(default=False, description="Whether selected by the generic default")
-    description: str | None = Field(None, description="Semantic guidance for model recognition")
-    examples: list[str] = Field(default_factory=list, description="Example texts")
-    color: str = Field(default="#6B7280", description="Display color")
-    regex_pattern: str | None = Field(None, description="Optional regex fallback")
-    use_llm: bool = Field(default=True, description="Whether semantic recognition is enabled")
-    enabled: bool = Field(default=True, description="Whether the type is enabled")
-    order: int = Field(default=100, description="Sort order")
-    tag_template: str | None = Field(None, description="Structured replacement tag template")
+logger = logging.getLogger(__name__)
 
+# ── 数据模型 ──────────────────────────────────────────────
 
 class EntityTypesResponse(BaseModel):
     """实体类型列表响应"""
@@ -109,6 +98,10 @@ class UpdateEntityTypeRequest(BaseModel):
     default_enabled: bool | None = None
 
 
+# update_type 允许写入 EntityTypeConfig 的字段（导入时算一次）
+_MUTATION_FIELDS = frozenset(UpdateEntityTypeRequest.model_fields) & frozenset(EntityTypeConfig.model_fields)
+
+
 class RegexTestRequest(BaseModel):
     pattern: str = Field(..., description="正则表达式")
     test_text: str = Field(..., description="测试文本")
@@ -122,13 +115,7 @@ class RegexTestResult(BaseModel):
 
 # ── 预置类型 ──────────────────────────────────────────────
 
-_PRESET_JSON_PATH = _os.path.join(
-    _os.path.dirname(__file__), "..", "..", "config", "preset_entity_types.json"
-)
-_raw_presets = load_json(_PRESET_JSON_PATH, default={})
-PRESET_ENTITY_TYPES: dict[str, EntityTypeConfig] = {
-    k: EntityTypeConfig(**v) for k, v in _raw_presets.items() if k not in TYPE_ID_ALIASES
-}
+PRESET_ENTITY_TYPES: dict[str, EntityTypeConfig] = load_preset_entity_types()
 
 def is_default_generic_entity_type_id(type_id: str) -> bool:
     """Return whether a type belongs to the broad generic default schema."""
@@ -325,6 +312,17 @@ def normalize_custom_entity_type(config: EntityTypeConfig) -> EntityTypeConfig:
 
 # ── 持久化 ────────────────────────────────────────────────
 
+def load_types_unchecked(rows: list[dict], trusted: bool = True) -> list[EntityTypeConfig]:
+    """把持久化行还原为 EntityTypeConfig。
+
+    trusted=True 时认为数据由本应用写出，用 model_construct 跳过字段校验；
+    外部导入等不可信来源传 trusted=False，走完整的 model_validate。
+    """
+    if not trusted:
+        return [EntityTypeConfig.model_validate(row) for row in rows]
+    return [EntityTypeConfig.model_construct(**row) for row in rows]
+
+
 def _load_entity_types() -> dict[str, EntityTypeConfig]:
     """Load entity types from disk, merging with presets."""
     raw = load_json(settings.ENTITY_TYPES_STORE_PATH, default=None)
@@ -332,23 +330,22 @@ def _load_entity_types() -> dict[str, EntityTypeConfig]:
         return {k: v.model_copy() if hasattr(v, "model_copy") else v for k, v in PRESET_ENTITY_TYPES.items()}
     merged: dict[str, EntityTypeConfig] = {}
     for key, preset in PRESET_ENTITY_TYPES.items():
-        if key in raw:
-            try:
-                loaded = EntityTypeConfig(**raw[key]) if isinstance(raw[key], dict) else preset
-                # Built-in definitions are source-controlled. Preserve only the
-                # user's enabled/disabled choice, so corrected regex/LLM/default
-                # boundaries are not kept stale by old runtime snapshots.
-                merged[key] = preset.model_copy(update={"enabled": loaded.enabled if preset.enabled else False})
-            except Exception:
-                merged[key] = preset
+        row = raw.get(key)
+        if isinstance(row, dict):
+            # Built-in definitions are source-controlled. Preserve only the
+            # user's enabled/disabled choice, so corrected regex/LLM/default
+            # boundaries are not kept stale by old runtime snapshots.
+            enabled = bool(row.get("enabled", True))
+            merged[key] = preset.model_copy(update={"enabled": enabled if preset.enabled else False})
         else:
             merged[key] = preset
     for key, val in raw.items():
         if key in TYPE_ID_ALIASES:
             continue
-        if key not in merged and str(key).startswith("custom_"):
+        if key not in merged and str(key).startswith("custom_") and isinstance(val, dict):
             try:
-                loaded = EntityTypeConfig(**val) if isinstance(val, dict) else val
+                # 快照由本应用写出，按可信数据加载；随后仍统一经过 normalize 归一化
+                loaded = load_types_unchecked([{"id": key, **val}])[0]
                 merged[key] = normalize_custom_entity_type(loaded)
             except Exception:
                 pass
@@ -356,38 +353,166 @@ def _load_entity_types() -> dict[str, EntityTypeConfig]:
 
 
 def _persist_entity_types() -> None:
-    save_json(settings.ENTITY_TYPES_STORE_PATH, entity_types_db)
+    # 所有写操作都经过这里落盘，顺带让序列化缓存失效
+    _invalidate_caches()
+    save_json(settings.ENTITY_TYPES_STORE_PATH, dict(entity_types_db))
+
+
+# ── 序列化缓存 ────────────────────────────────────────────
+# entity_types_db 每次变更版本号 +1；列表接口的 JSON 字节按 (参数) 缓存，版本不一致才重建。
+_version = 0
+_serialized_cache: dict[tuple[bool, int, int], tuple[int, bytes]] = {}
+_SERIALIZED_CACHE_MAX = 64
+
+
+# 启用类型按 order 排好序的只读快照，以及供逐类型扫描用的平行元组（SoA）；随版本号一起重建
+_enabled_sorted: tuple[EntityTypeConfig, ...] = ()
+_active_ids: tuple[str, ...] = ()
+_active_regex_patterns: tuple[str | None, ...] = ()
+_active_data_domains: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class _TypeIndex:
+    """entity_types_db 的列式快照（按 db 插入顺序），过滤时只读掩码，不碰模型属性。"""
+
+    ids: tuple[str, ...] = ()
+    enabled: bytes = b""
+    use_llm: bytes = b""
+    configs: tuple[EntityTypeConfig, ...] = ()
+    # 按 order 排好序的全部类型（稳定排序，order 相同时保持插入顺序）
+    sorted_ids: tuple[str, ...] = ()
+    sorted_configs: tuple[EntityTypeConfig, ...] = ()
+    # 检测热路径上的过滤结果，只在重建时算一次（元组不可变，可直接共享给调用方）
+    enabled_types: tuple[EntityTypeConfig, ...] = ()
+    llm_types: tuple[EntityTypeConfig, ...] = ()
+    default_generic_types: tuple[EntityTypeConfig, ...] = ()
+
+    @classmethod
+    def build(cls, configs: list[EntityTypeConfig]) -> _TypeIndex:
+        ordered = sorted(configs, key=lambda t: t.order)
+        enabled = bytes(t.enabled for t in configs)
+        use_llm = bytes(t.enabled and t.use_llm for t in configs)
+        return cls(
+            ids=tuple(t.id for t in configs),
+            enabled=enabled,
+            use_llm=use_llm,
+            configs=tuple(configs),
+            sorted_ids=tuple(t.id for t in ordered),
+            sorted_configs=tuple(ordered),
+            enabled_types=tuple(compress(configs, enabled)),
+            llm_types=tuple(compress(configs, use_llm)),
+            default_generic_types=tuple(
+                t
+                for t in compress(configs, enabled)
+                if t.default_enabled and is_default_generic_entity_type_id(t.id)
+            ),
+        )
+
+
+_idx = _TypeIndex()
+
+
+# 上次编译时启用正则类型的 (id, pattern) 签名；未变化时跳过重编译与扫描器重建
+_regex_signature: tuple[tuple[str, str], ...] | None = None
+_regex_types: tuple[EntityTypeConfig, ...] = ()
+
+
+def _rebuild_active_index() -> bool:
+    """重建启用类型快照；返回启用正则集合是否变化（变化时已重新编译）。"""
+    global _enabled_sorted, _active_ids, _active_regex_patterns, _active_data_domains, _idx
+    global _regex_signature, _regex_types
+    _idx = _TypeIndex.build(list(entity_types_db.values()))
+    types = [t for t in _idx.sorted_configs if t.enabled]
+    _enabled_sorted = tuple(types)
+    _active_ids = tuple(t.id for t in types)
+    _active_regex_patterns = tuple(t.regex_pattern for t in types)
+    _active_data_domains = tuple(t.data_domain for t in types)
+    signature = tuple(
+        (type_id, pattern) for type_id, pattern in zip(_active_ids, _active_regex_patterns, strict=True) if pattern
+    )
+    changed = signature != _regex_signature
+    if changed:
+        _regex_signature = signature
+        _compile_all()
+    # 配置对象每次写入都会被替换，正则类型元组总要重取一遍
+    _regex_types = tuple(t for t in _enabled_sorted if t.id in _COMPILED_PATTERNS)
+    return changed
+
+
+# 启用且配置了正则的类型 id -> 编译好的模式；禁用类型仍按需惰性编译
+_COMPILED_PATTERNS: dict[str, re.Pattern] = {}
 
 
-# 内存存储（启动时从磁盘恢复）
-entity_types_db: dict[str, EntityTypeConfig] = _load_entity_types()
+def _compile_all() -> None:
+    """预编译所有启用类型的正则（模块加载及每次配置变更时执行）。"""
+    global _COMPILED_PATTERNS
+    compiled_patterns: dict[str, re.Pattern] = {}
+    for type_config, pattern in zip(_enabled_sorted, _active_regex_patterns, strict=True):
+        if not pattern:
+            continue
+        compiled = type_config.compiled_regex
+        if compiled is not None:
+            compiled_patterns[type_config.id] = compiled
+    _COMPILED_PATTERNS = compiled_patterns
+
+
+def _invalidate_caches() -> None:
+    global _version
+    _version += 1
+    if not _rebuild_active_index():
+        return
+    # 扫描器模块已加载时同步重建多模式扫描器（启动阶段由扫描器模块自行预热；
+    # 先导入扫描器模块时它还在初始化中，rebuild_scanner 尚未定义）
+    rebuild_scanner = getattr(sys.modules.get("app.services.entity_types_compiler"), "rebuild_scanner", None)
+    if rebuild_scanner is not None:
+        rebuild_scanner(get_regex_types())
+
+
+# 内存存储（启动时从磁盘恢复）。对外是只读视图：读取无锁，
+# 写操作在 _db_lock 下复制一份 dict 修改后整体替换（写时复制），读方不会看到半成品
+entity_types_db: Mapping[str, EntityTypeConfig] = MappingProxyType(_load_entity_types())
+_db_lock = threading.Lock()
 _persist_entity_types()
 
 
+def _commit_db(new_db: dict[str, EntityTypeConfig]) -> None:
+    """替换只读视图并重建派生缓存、落盘；调用方需持有 _db_lock。"""
+    global entity_types_db
+    entity_types_db = MappingProxyType(new_db)
+    _persist_entity_types()
+
+
 # ── 公共查询 ──────────────────────────────────────────────
 
-def get_enabled_types() -> list[EntityTypeConfig]:
-    """获取所有启用的实体类型"""
-    return [t for t in entity_types_db.values() if t.enabled]
+def get_enabled_types() -> tuple[EntityTypeConfig, ...]:
+    """获取所有启用的实体类型（只在配置变更时重建）"""
+    return _idx.enabled_types
 
 
 def get_default_generic_types() -> list[EntityTypeConfig]:
-    """获取通用默认配置中的启用实体类型。"""
-    return [
-        t
-        for t in entity_types_db.values()
-        if t.enabled and t.default_enabled and is_default_generic_entity_type_id(t.id)
-    ]
+    """获取通用默认配置中的启用实体类型（随配置版本重建，这里只复制引用）。"""
+    return list(_idx.default_generic_types)
+
+
+def get_active_types() -> tuple[EntityTypeConfig, ...]:
+    """获取启用的实体类型（按 order 排序，只在配置变更时重建）"""
+    return _enabled_sorted
+
+
+def get_regex_types() -> tuple[EntityTypeConfig, ...]:
+    """获取使用正则识别的类型（compiled_regex 已预编译，语法无效的模式不会返回）"""
+    return _regex_types
 
 
-def get_regex_types() -> list[EntityTypeConfig]:
-    """获取使用正则识别的类型"""
-    return [t for t in entity_types_db.values() if t.enabled and t.regex_pattern]
+def get_compiled_pattern(type_id: str) -> re.Pattern | None:
+    """启用类型的预编译正则；类型未启用、未配置正则或模式无效时返回 None。"""
+    return _COMPILED_PATTERNS.get(type_id)
 
 
-def get_llm_types() -> list[EntityTypeConfig]:
-    """获取使用LLM识别的类型"""
-    return [t for t in entity_types_db.values() if t.enabled and t.use_llm]
+def get_llm_types() -> tuple[EntityTypeConfig, ...]:
+    """获取使用LLM识别的类型（只在配置变更时重建）"""
+    return _idx.llm_types
 
 
 def resolve_requested_entity_types(entity_type_ids: list[str]) -> list[EntityTypeConfig]:
@@ -420,10 +545,10 @@ def resolve_requested_entity_types(entity_type_ids: list[str]) -> list[EntityTyp
 # ── 业务方法 ──────────────────────────────────────────────
 
 def list_types(enabled_only: bool = False, page: int = 1, page_size: int = 0) -> EntityTypesResponse:
-    types = list(entity_types_db.values())
     if enabled_only:
-        types = [t for t in types if t.enabled]
-    types.sort(key=lambda x: x.order)
+        types = list(_enabled_sorted)
+    else:
+        types = list(_idx.sorted_configs)
     total = len(types)
     if page_size <= 0:
         return EntityTypesResponse(custom_types=types, total=total, page=1, page_size=total)
@@ -432,40 +557,82 @@ def list_types(enabled_only: bool = False, page: int = 1, page_size: int = 0) ->
     return EntityTypesResponse(custom_types=page_items, total=total, page=page, page_size=page_size)
 
 
+def get_serialized(enabled_only: bool = False, page: int = 1, page_size: int = 0) -> bytes:
+    """list_types 的 JSON 字节；数据未变更时直接复用上次的序列化结果。"""
+    key = (enabled_only, page, page_size)
+    cached = _serialized_cache.get(key)
+    if cached is not None and cached[0] == _version:
+        return cached[1]
+    data = list_types(enabled_only, page, page_size).model_dump_json().encode("utf-8")
+    if len(_serialized_cache) >= _SERIALIZED_CACHE_MAX:
+        _serialized_cache.clear()
+    _serialized_cache[key] = (_version, data)
+    return data
+
+
 def get_type(type_id: str) -> EntityTypeConfig | None:
     return entity_types_db.get(type_id)
 
 
+# 单个类型的 JSON 字节缓存；整体随 _version 失效（前端轮询同一 id 时免去重复序列化）
+_type_bytes_cache: dict[str, bytes] = {}
+_type_bytes_version = -1
+
+
+def get_type_serialized(type_id: str) -> bytes | None:
+    """get_type 的 JSON 字节；类型不存在时返回 None。"""
+    global _type_bytes_version
+    if _type_bytes_version != _version:
+        _type_bytes_cache.clear()
+        _type_bytes_version = _version
+    data = _type_bytes_cache.get(type_id)
+    if data is None:
+        type_config = entity_types_db.get(type_id)
+        if type_config is None:
+            return None
+        data = type_config.model_dump_json().encode("utf-8")
+        _type_bytes_cache[type_id] = data
+    return data
+
+
+def _new_custom_type_id() -> str:
+    """custom_ + 8 位十六进制（4 字节随机数，与原 uuid4().hex[:8] 熵相同，免去 UUID 对象构造）。"""
+    while True:
+        type_id = f"custom_{_os.urandom(4).hex()}"
+        if type_id not in entity_types_db:
+            return type_id
+
+
 def create_type(request: CreateEntityTypeRequest) -> EntityTypeConfig:
-    type_id = f"custom_{uuid.uuid4().hex[:8]}"
     coref_enabled = bool(request.coref_enabled)
     data_domain, generic_target = normalize_text_taxonomy(
         request.data_domain,
         request.generic_target,
     )
-    new_type = EntityTypeConfig(
-        id=type_id,
-        name=request.name,
-        data_domain=data_domain,
-        generic_target=generic_target,
-        entity_type_ids=request.entity_type_ids or [],
-        linkage_groups=(
-            infer_linkage_groups(data_domain, generic_target)
-            if coref_enabled else []
-        ),
-        coref_enabled=coref_enabled,
-        default_enabled=bool(request.default_enabled),
-        description=request.description,
-        examples=request.examples,
-        color=request.color,
-        regex_pattern=None,
-        use_llm=True,
-        tag_template=build_tag_template(request.name),
-        enabled=True,
-        order=200,
-    )
-    entity_types_db[type_id] = new_type
-    _persist_entity_types()
+    with _db_lock:
+        type_id = _new_custom_type_id()
+        new_type = EntityTypeConfig(
+            id=type_id,
+            name=request.name,
+            data_domain=data_domain,
+            generic_target=generic_target,
+            entity_type_ids=request.entity_type_ids or [],
+            linkage_groups=(
+                infer_linkage_groups(data_domain, generic_target)
+                if coref_enabled else []
+            ),
+            coref_enabled=coref_enabled,
+            default_enabled=bool(request.default_enabled),
+            description=request.description,
+            examples=request.examples,
+            color=request.color,
+            regex_pattern=None,
+            use_llm=True,
+            tag_template=build_tag_template(request.name),
+            enabled=True,
+            order=200,
+        )
+        _commit_db({**entity_types_db, type_id: new_type})
     return new_type
 
 
@@ -478,35 +645,39 @@ def update_type(type_id: str, request: UpdateEntityTypeRequest) -> EntityTypeCon
         raise ValueError("L1 数据域必填")
     if request.generic_target is not None and not str(request.generic_target or "").strip():
         raise ValueError("L2 通用识别项必填")
-    existing = entity_types_db[type_id]
-    update_data = request.model_dump(exclude_unset=True)
-    next_data_domain = update_data.get("data_domain", existing.data_domain)
-    next_generic_target = update_data.get("generic_target", existing.generic_target)
-    if not str(next_data_domain or "").strip():
-        raise ValueError("L1 数据域必填")
-    if not str(next_generic_target or "").strip():
-        raise ValueError("L2 通用识别项必填")
-    next_data_domain, next_generic_target = normalize_text_taxonomy(
-        next_data_domain,
-        next_generic_target,
-    )
-    update_data["data_domain"] = next_data_domain
-    update_data["generic_target"] = next_generic_target
-    next_coref_enabled = update_data.get("coref_enabled", existing.coref_enabled)
-    update_data["linkage_groups"] = (
-        infer_linkage_groups(next_data_domain, next_generic_target)
-        if next_coref_enabled else []
-    )
-    update_data["regex_pattern"] = None
-    update_data["use_llm"] = True
-    if "name" in update_data or "tag_template" in update_data:
-        next_name = update_data.get("name", existing.name)
-        update_data["tag_template"] = build_tag_template(next_name)
-    for key, value in update_data.items():
-        setattr(existing, key, value)
-    entity_types_db[type_id] = existing
-    _persist_entity_types()
-    return existing
+    # 只取请求里显式给出的字段，不走 model_dump 的整模型遍历与拷贝；
+    # model_copy(update=) 不做校验，这里用预先算好的字段集合把关
+    update_data = {name: getattr(request, name) for name in request.model_fields_set & _MUTATION_FIELDS}
+    # 读取现值、合并与提交在同一把锁内完成，避免并发的 toggle/update 被旧副本覆盖
+    with _db_lock:
+        existing = entity_types_db.get(type_id)
+        if existing is None:
+            return None
+        next_data_domain = update_data.get("data_domain", existing.data_domain)
+        next_generic_target = update_data.get("generic_target", existing.generic_target)
+        if not str(next_data_domain or "").strip():
+            raise ValueError("L1 数据域必填")
+        if not str(next_generic_target or "").strip():
+            raise ValueError("L2 通用识别项必填")
+        next_data_domain, next_generic_target = normalize_text_taxonomy(
+            next_data_domain,
+            next_generic_target,
+        )
+        update_data["data_domain"] = next_data_domain
+        update_data["generic_target"] = next_generic_target
+        next_coref_enabled = update_data.get("coref_enabled", existing.coref_enabled)
+        update_data["linkage_groups"] = (
+            infer_linkage_groups(next_data_domain, next_generic_target)
+            if next_coref_enabled else []
+        )
+        update_data["regex_pattern"] = None
+        update_data["use_llm"] = True
+        if "name" in update_data or "tag_template" in update_data:
+            next_name = update_data.get("name", existing.name)
+            update_data["tag_template"] = build_tag_template(next_name)
+        updated = existing.model_copy(update=update_data)
+        _commit_db({**entity_types_db, type_id: updated})
+    return updated
 
 
 def delete_type(type_id: str) -> tuple[bool, str]:
@@ -519,24 +690,29 @@ def delete_type(type_id: str) -> tuple[bool, str]:
         return False, "实体类型不存在"
     if type_id in PRESET_ENTITY_TYPES:
         return False, "预置类型不能删除，只能禁用"
-    del entity_types_db[type_id]
-    _persist_entity_types()
+    with _db_lock:
+        if type_id not in entity_types_db:
+            return False, "实体类型不存在"
+        new_db = dict(entity_types_db)
+        del new_db[type_id]
+        _commit_db(new_db)
     return True, ""
 
 
 def toggle_type(type_id: str) -> bool | None:
     """Returns new enabled state, or None if not found."""
-    if type_id not in entity_types_db:
-        return None
-    entity_types_db[type_id].enabled = not entity_types_db[type_id].enabled
-    _persist_entity_types()
-    return entity_types_db[type_id].enabled
+    with _db_lock:
+        current = entity_types_db.get(type_id)
+        if current is None:
+            return None
+        toggled = current.model_copy(update={"enabled": not current.enabled})
+        _commit_db({**entity_types_db, type_id: toggled})
+    return toggled.enabled
 
 
 def reset_types() -> None:
-    global entity_types_db
-    entity_types_db = PRESET_ENTITY_TYPES.copy()
-    _persist_entity_types()
+    with _db_lock:
+        _commit_db(PRESET_ENTITY_TYPES.copy())
 
 
 def test_regex(pattern: str, test_text: str) -> RegexTestResult:
@@ -567,6 +743,6 @@ def test_regex(pattern: str, test_text: str) -> RegexTestResult:
 # so other layers don't couple to the module-level mutable dict.
 # ---------------------------------------------------------------------------
 
-def get_entity_types_db() -> dict[str, EntityTypeConfig]:
-    """Return the in-memory entity-types dictionary."""
+def get_entity_types_db() -> Mapping[str, EntityTypeConfig]:
+    """Return a read-only view of the in-memory entity types."""
     return entity_types_db
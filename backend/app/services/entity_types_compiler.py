@@ -0,0 +1,450 @@
+"""
+实体类型正则多模式扫描器
+
+把启用的 custom 类型 regex_pattern 编译成一个扫描器，文档只需调用一次 scan()。
+- 安装了 hyperscan 时：用多模式数据库做一次线性预扫，只对命中的类型再跑 Python 正则，
+  保证结果与 ``re`` 语义完全一致；hyperscan 不支持的模式始终走 Python 正则。
+- 未安装 hyperscan 但装了 google-re2 时：用 re2.Set 做同样的一次线性预扫。
+- 都未安装时：把全部模式拼成一个大交替式，先在工作进程里 search 一次——整篇文档
+  没有任何类型命中时（最常见的情况）直接返回；有命中再对每个预编译模式跑
+  safe_finditer_many（带超时，防 ReDoS）。交替式只回答“有没有”，不用 lastgroup
+  分派，因为同一位置多个类型都能匹配时交替式只会报出第一个。
+
+此外，每个模式在编译时提取一个必需字面量（如 "身份证"），扫描前先做字面量预筛：
+文档中不含该字面量的类型直接跳过，没有 PII 的长文档可以完全不跑正则。
+
+扫描器按 (id, regex_pattern, enabled) 的 SHA1 缓存，类型被编辑后自动失效；
+hyperscan 数据库另按模式内容哈希序列化到 DATA_DIR/regex_cache，重启后直接加载。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+from app.core.persistence import load_json, save_json
+from app.core.safe_regex import RegexTimeoutError, safe_finditer_many, safe_search
+from app.services.entity_type_config import compile_entity_pattern
+from app.services.entity_type_service import get_compiled_pattern, get_regex_types
+
+logger = logging.getLogger(__name__)
+
+_SCANNER_CACHE_SIZE = 16
+_FINDITER_TIMEOUT = 2.0
+_MIN_LITERAL_LEN = 2
+_QUANTIFIERS = "?*+{"
+# {m} / {m,} / {,n} / {m,n} 计数量词；其中的数字不是字面量
+_COUNTED_QUANTIFIER = re.compile(r"\{\d*(?:,\d*)?\}")
+# 反向引用按组号/组名引用，拼进交替式后会指错组，含此类模式时不建交替式
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+# re2 的 \d / \w / \s / \b 只认 ASCII，而 Python str 模式按 Unicode 匹配（如全角数字）
+_RE2_ASCII_CLASS = re.compile(r"\\[dDwWsSbB]")
+
+
+def _is_literal_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum() or "\u4e00" <= ch <= "\u9fff"
+
+
+def _escape_length(pattern: str, i: int) -> int:
+    """pattern[i] 为反斜杠时，返回整个转义序列的长度（\\x41、\\u4e00、\\N{...}、\\101 等多字符转义）。
+
+    拿不准时宁可多跳：多跳只会让字面量变短，少跳会把转义里的数字当成必需字面量。
+    """
+    n = len(pattern)
+    if i + 1 >= n:
+        return 1
+    kind = pattern[i + 1]
+    end = i + 2
+    if kind in "xuU":
+        width = {"x": 2, "u": 4, "U": 8}[kind]
+        while end < n and end - (i + 2) < width and pattern[end] in "0123456789abcdefABCDEF":
+            end += 1
+    elif kind == "N" and end < n and pattern[end] == "{":
+        close = pattern.find("}", end)
+        end = n if close < 0 else close + 1
+    elif kind.isdigit():
+        # \0 / \012 八进制、\101 八进制、\1 / \12 反向引用：后续最多再吞两位数字
+        while end < n and end - (i + 2) < 2 and pattern[end].isdigit():
+            end += 1
+    return end - i
+
+
+def extract_required_literal(pattern: str) -> str | None:
+    """从正则中提取一个必需出现的字面量（取最长的一段），提取不出时返回 None。
+
+    只看最外层、不带量词的字母/数字/汉字连续段（``{m,n}`` 量词体里的数字不算）；
+    顶层有 ``|``、含内联 flag 的模式一律放弃，
+    宁可不预筛也不能漏匹配。返回值已 casefold，与 IGNORECASE 语义对齐。
+    """
+    if not pattern or pattern.startswith("(?") and not pattern.startswith(("(?:", "(?P<", "(?<", "(?=", "(?!")):
+        return None
+    runs: list[str] = []
+    current: list[str] = []
+    depth = 0
+    i = 0
+    n = len(pattern)
+    while i < n:
+        ch = pattern[i]
+        if ch == "\\":
+            runs.append("".join(current))
+            current = []
+            i += _escape_length(pattern, i)
+            continue
+        if ch == "[":
+            runs.append("".join(current))
+            current = []
+            i += 1
+            if i < n and pattern[i] == "^":
+                i += 1
+            if i < n and pattern[i] == "]":
+                i += 1
+            while i < n and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+            continue
+        if ch == "{":
+            quantifier = _COUNTED_QUANTIFIER.match(pattern, i)
+            if quantifier:
+                runs.append("".join(current))
+                current = []
+                i = quantifier.end()
+                continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return None
+        if depth == 0 and ch != ")" and _is_literal_char(ch):
+            if i + 1 < n and pattern[i + 1] in _QUANTIFIERS:
+                # 带量词的字符可能出现 0 次（或重复），截断当前段
+                runs.append("".join(current))
+                current = []
+            else:
+                current.append(ch)
+        else:
+            runs.append("".join(current))
+            current = []
+        i += 1
+    runs.append("".join(current))
+    best = max(runs, key=len)
+    if len(best) < _MIN_LITERAL_LEN:
+        return None
+    return best.casefold()
+
+
+class EntityTypeScanner:
+    """一组实体类型正则的扫描器；scan(text) -> [(entity_id, start, end), ...]"""
+
+    def __init__(self, entries: list[tuple[str, re.Pattern]]):
+        self._entries = entries
+        self._hs_db = None
+        # hyperscan 数据库覆盖的 entries 下标；不在其中的模式每次都要跑
+        self._hs_indexes: frozenset[int] = frozenset()
+        self._literals: list[str | None] = [extract_required_literal(c.pattern) for _, c in entries]
+        self._automaton = None
+        self._re2_set = None
+        self._re2_indexes: list[int] = []
+        self._union: re.Pattern | None = None
+        self._build_literal_prefilter()
+        self._build_hyperscan()
+        if self._hs_db is None:
+            self._build_re2_set()
+        if self._hs_db is None and self._re2_set is None:
+            self._build_union()
+
+    @property
+    def type_ids(self) -> list[str]:
+        return [entity_id for entity_id, _ in self._entries]
+
+    def _build_hyperscan(self) -> None:
+        if not self._entries:
+            return
+        try:
+            import hyperscan
+        except ImportError:
+            logger.debug("hyperscan not installed, entity regex scan uses Python re")
+            return
+
+        # UCP：\d / \w / \s 按 Unicode 属性匹配（如全角数字），与 Python re 的 str 模式一致
+        flags = (
+            hyperscan.HS_FLAG_CASELESS
+            | hyperscan.HS_FLAG_UTF8
+            | hyperscan.HS_FLAG_UCP
+            | hyperscan.HS_FLAG_SINGLEMATCH
+        )
+        expressions = [compiled.pattern.encode("utf-8") for _, compiled in self._entries]
+        digest = hashlib.sha1(
+            repr((getattr(hyperscan, "__version__", ""), flags, expressions)).encode("utf-8")
+        ).hexdigest()
+        if self._load_hyperscan_cache(hyperscan, digest):
+            return
+
+        supported: list[int] = []
+        for index, expression in enumerate(expressions):
+            try:
+                probe = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+                probe.compile(expressions=[expression], ids=[index], flags=[flags])
+            except Exception:
+                continue
+            supported.append(index)
+        if not supported:
+            return
+        try:
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            db.compile(
+                expressions=[expressions[i] for i in supported],
+                ids=supported,
+                flags=[flags] * len(supported),
+            )
+        except Exception as exc:
+            logger.warning("hyperscan database compile failed, falling back to Python re: %s", exc)
+            return
+        self._hs_db = db
+        self._hs_indexes = frozenset(supported)
+        self._save_hyperscan_cache(hyperscan, digest, supported)
+
+    def _build_re2_set(self) -> None:
+        if not self._entries:
+            return
+        try:
+            import re2
+        except ImportError:
+            logger.debug("google-re2 not installed, entity regex scan uses Python re")
+            return
+        try:
+            options = re2.Options()
+            options.case_sensitive = False
+            regex_set = re2.Set.SearchSet(options)
+        except Exception as exc:
+            logger.debug("re2.Set unavailable: %s", exc)
+            return
+        # re2 不支持回溯特性（如环视），Add 失败的模式不进 Set，每次照常跑 Python 正则；
+        # 含 ASCII 语义简写类的模式预扫会漏掉 Python 能命中的文本，同样不进 Set
+        set_indexes: list[int] = []
+        for index, (_, compiled) in enumerate(self._entries):
+            if _RE2_ASCII_CLASS.search(compiled.pattern):
+                continue
+            try:
+                regex_set.Add(compiled.pattern)
+            except Exception:
+                continue
+            set_indexes.append(index)
+        if not set_indexes:
+            return
+        try:
+            regex_set.Compile()
+        except Exception as exc:
+            logger.warning("re2.Set compile failed, falling back to Python re: %s", exc)
+            return
+        self._re2_set = regex_set
+        self._re2_indexes = set_indexes
+
+    def _build_union(self) -> None:
+        """标准库兜底：所有模式拼成一个交替式，用一次 search 判断文档里是否有任何命中。"""
+        if len(self._entries) < 2:
+            return
+        flags = {compiled.flags for _, compiled in self._entries}
+        patterns = [compiled.pattern for _, compiled in self._entries]
+        if len(flags) != 1 or any(_BACKREFERENCE.search(p) for p in patterns):
+            return
+        try:
+            self._union = re.compile("|".join(f"(?:{p})" for p in patterns), flags.pop())
+        except re.error as exc:
+            logger.debug("Entity regex union compile failed: %s", exc)
+
+    def _prefilter_hits(self, text: str) -> tuple[set[int], frozenset[int]] | None:
+        """多模式预扫：返回 (命中的 entries 下标, 参与预扫的下标)；没有可用预扫器时返回 None。"""
+        if self._hs_db is not None:
+            hits: set[int] = set()
+
+            def on_match(pattern_id: int, start: int, end: int, flags: int, context: Any) -> None:
+                hits.add(pattern_id)
+
+            try:
+                self._hs_db.scan(text.encode("utf-8"), match_event_handler=on_match)
+            except Exception as exc:
+                logger.warning("hyperscan scan failed, falling back to Python re: %s", exc)
+                return None
+            return hits, self._hs_indexes
+        if self._re2_set is not None:
+            try:
+                matched = self._re2_set.Match(text)
+            except Exception as exc:
+                logger.warning("re2.Set match failed, falling back to Python re: %s", exc)
+                return None
+            return {self._re2_indexes[i] for i in matched}, frozenset(self._re2_indexes)
+        if self._union is not None:
+            try:
+                found = safe_search(self._union, text, timeout=_FINDITER_TIMEOUT)
+            except RegexTimeoutError:
+                return None
+            if not found:
+                return set(), frozenset(range(len(self._entries)))
+        return None
+
+    @staticmethod
+    def _hyperscan_cache_path(digest: str) -> str:
+        return os.path.join(settings.DATA_DIR, "regex_cache", f"{digest}.hsdb")
+
+    def _load_hyperscan_cache(self, hyperscan: Any, digest: str) -> bool:
+        """按内容哈希加载已序列化的数据库，重启后免去整套编译。"""
+        path = self._hyperscan_cache_path(digest)
+        meta = load_json(f"{path}.json", default=None)
+        if not isinstance(meta, dict) or not os.path.exists(path):
+            return False
+        try:
+            with open(path, "rb") as f:
+                db = hyperscan.loadb(f.read())
+        except Exception as exc:
+            logger.debug("hyperscan cache %s unusable: %s", path, exc)
+            return False
+        supported = [int(i) for i in meta.get("supported", [])]
+        if not supported:
+            return False
+        self._hs_db = db
+        self._hs_indexes = frozenset(supported)
+        return True
+
+    def _save_hyperscan_cache(self, hyperscan: Any, digest: str, supported: list[int]) -> None:
+        path = self._hyperscan_cache_path(digest)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(hyperscan.dumpb(self._hs_db))
+            os.replace(tmp_path, path)
+            save_json(f"{path}.json", {"supported": supported})
+        except Exception as exc:
+            logger.debug("hyperscan cache write failed: %s", exc)
+
+    def _build_literal_prefilter(self) -> None:
+        if not any(self._literals):
+            return
+        try:
+            import ahocorasick
+        except ImportError:
+            logger.debug("pyahocorasick not installed, literal prefilter uses str.find")
+            return
+        automaton = ahocorasick.Automaton()
+        for literal in set(filter(None, self._literals)):
+            automaton.add_word(literal, literal)
+        automaton.make_automaton()
+        self._automaton = automaton
+
+    def _literal_candidates(self, text: str) -> list[int]:
+        """字面量预筛：返回文档中含必需字面量（或无法提取字面量）的 entries 下标。"""
+        if not any(self._literals):
+            return list(range(len(self._entries)))
+        folded = text.casefold()
+        if self._automaton is not None:
+            present = {literal for _, literal in self._automaton.iter(folded)}
+            return [i for i, literal in enumerate(self._literals) if literal is None or literal in present]
+        return [i for i, literal in enumerate(self._literals) if literal is None or literal in folded]
+
+    def _candidate_indexes(self, text: str) -> list[int]:
+        candidates = self._literal_candidates(text)
+        if not candidates:
+            return candidates
+        prefiltered = self._prefilter_hits(text)
+        if prefiltered is None:
+            return candidates
+        hits, covered = prefiltered
+        return [index for index in candidates if index in hits or index not in covered]
+
+    def scan(self, text: str) -> list[tuple[str, int, int]]:
+        """扫描一次文档，按类型顺序返回 (entity_id, start, end)。"""
+        if not text or not self._entries:
+            return []
+        candidates = [self._entries[index] for index in self._candidate_indexes(text)]
+        if not candidates:
+            return []
+        # 多个类型共用同一模式时只匹配一次；去重后的模式并行提交到正则工作进程池
+        distinct: dict[tuple[str, int], re.Pattern] = {}
+        for _, compiled in candidates:
+            distinct.setdefault((compiled.pattern, compiled.flags), compiled)
+        found = dict(zip(
+            distinct,
+            safe_finditer_many(list(distinct.values()), text, timeout=_FINDITER_TIMEOUT),
+            strict=True,
+        ))
+        results: list[tuple[str, int, int]] = []
+        for entity_id, compiled in candidates:
+            matches = found[(compiled.pattern, compiled.flags)]
+            if matches is None:
+                logger.warning("Custom regex skipped for %s: regex finditer timed out", entity_id)
+                continue
+            results.extend((entity_id, m.start(), m.end()) for m in matches)
+        return results
+
+
+def _scanner_key(entity_types: list[Any]) -> str:
+    rows = sorted(
+        (
+            str(getattr(t, "id", "") or "").strip(),
+            str(getattr(t, "regex_pattern", "") or "").strip(),
+            bool(getattr(t, "enabled", True)),
+        )
+        for t in entity_types
+    )
+    return hashlib.sha1(repr(rows).encode("utf-8")).hexdigest()
+
+
+def _build_scanner(entity_types: list[Any]) -> EntityTypeScanner:
+    entries: list[tuple[str, re.Pattern]] = []
+    # 调用方已按请求选好类型，这里不再按 enabled 过滤，保持与逐类型匹配时一致
+    for entity_type in entity_types:
+        entity_id = str(getattr(entity_type, "id", "") or "").strip()
+        pattern = str(getattr(entity_type, "regex_pattern", "") or "").strip()
+        if not entity_id or not pattern:
+            continue
+        compiled = get_compiled_pattern(entity_id)
+        if compiled is None or compiled.pattern != pattern:
+            compiled = getattr(entity_type, "compiled_regex", None) or compile_entity_pattern(pattern)
+        if compiled is None:
+            logger.warning("Custom regex skipped for %s: invalid pattern", entity_id)
+            continue
+        entries.append((entity_id, compiled))
+    return EntityTypeScanner(entries)
+
+
+_scanners: OrderedDict[str, EntityTypeScanner] = OrderedDict()
+_scanners_lock = threading.Lock()
+
+
+def get_scanner(entity_types: list[Any]) -> EntityTypeScanner:
+    """获取（或构建并缓存）一组实体类型对应的扫描器。"""
+    key = _scanner_key(entity_types)
+    with _scanners_lock:
+        scanner = _scanners.get(key)
+        if scanner is not None:
+            _scanners.move_to_end(key)
+            return scanner
+    scanner = _build_scanner(entity_types)
+    with _scanners_lock:
+        _scanners[key] = scanner
+        while len(_scanners) > _SCANNER_CACHE_SIZE:
+            _scanners.popitem(last=False)
+    return scanner
+
+
+def rebuild_scanner(entity_types: list[Any]) -> None:
+    """类型配置变更后预先构建新扫描器，避免第一份文档承担编译开销。"""
+    try:
+        get_scanner(entity_types)
+    except Exception as exc:
+        logger.warning("Entity regex scanner rebuild failed: %s", exc)
+
+
+def scan(text: str, entity_types: list[Any]) -> list[tuple[str, int, int]]:
+    """对文档做一次多类型正则扫描。"""
+    return get_scanner(entity_types).scan(text)
+
+
+rebuild_scanner(get_regex_types())
@@ -31,6 +31,7 @@ from app.core.file_validation import (  # canonical source; re-exported for back
 from app.core.file_validation import (
     TEXT_EXTENSIONS as _TEXT_EXTENSIONS,  # noqa: F401
 )
+from app.core.file_validation import file_ext as _file_ext
 from app.core.persistence import load_json
 from app.models.schemas import (
     BatchDownloadRequest,
@@ -248,7 +249,7 @@ def _normalize_store_path(raw: object, preferred_dir: str) -> str | None:
 
 def repair_file_store_paths() -> int:
     """Normalize legacy relative paths so jobs/history survive restarts from any working directory."""
-    repaired = 0
+    updates: dict[str, dict] = {}
     for file_id, info in file_store.items():
         if not isinstance(info, dict):
             continue
@@ -266,10 +267,12 @@ def repair_file_store_paths() -> int:
             changed = True
 
         if changed:
-            file_store.set(file_id, next_info)
-            repaired += 1
+            updates[file_id] = next_info
 
-    return repaired
+    # 启动修复可能涉及大量记录：合并为一个事务写入，而不是逐条提交
+    if updates:
+        file_store.update(updates)
+    return len(updates)
 
 
 _OUTPUT_ARTIFACT_FIELDS = (
@@ -314,7 +317,7 @@ def clear_file_output(file_id: str, *, delete_disk: bool = True) -> bool:
 def repair_file_store_output_records() -> int:
     """Drop unsafe output metadata while preserving historical completion state."""
     repaired = 0
-    for file_id, info in file_store.items():
+    for file_id, info in file_store.metadata_items():
         if not isinstance(info, dict):
             continue
         output_path = info.get("output_path")
@@ -332,7 +335,7 @@ def repair_file_store_output_records() -> int:
 
 def restore_file_store_output_from_history() -> int:
     """Restore output metadata that was cleared even though processing history exists."""
-    restored = 0
+    updates: dict[str, dict] = {}
     for file_id, info in file_store.items():
         if not isinstance(info, dict) or info.get("output_path"):
             continue
@@ -365,10 +368,11 @@ def restore_file_store_output_from_history() -> int:
             if inferred_count > 0:
                 next_info["redacted_count"] = inferred_count
 
-        file_store.set(file_id, next_info)
-        restored += 1
+        updates[file_id] = next_info
 
-    return restored
+    if updates:
+        file_store.update(updates)
+    return len(updates)
 
 
 # ---------------------------------------------------------------------------
@@ -383,7 +387,7 @@ def migrate_json_to_sqlite() -> None:
     raw = load_json(json_path, default={}) or {}
     if not isinstance(raw, dict) or not raw:
         return
-    count = 0
+    migrated: dict[str, dict] = {}
     for file_id, info in raw.items():
         if not isinstance(info, dict):
             continue
@@ -400,10 +404,10 @@ def migrate_json_to_sqlite() -> None:
             n = recognition_count_from_stored_fields(info)
             if n > 0:
                 info["redacted_count"] = n
-        file_store.set(file_id, info)
-        count += 1
-    if count:
-        logger.info("Migrated %d files from JSON to SQLite file_store", count)
+        migrated[file_id] = info
+    if migrated:
+        file_store.update(migrated)
+        logger.info("Migrated %d files from JSON to SQLite file_store", len(migrated))
     # Backup old JSON file
     backup = json_path + ".migrated"
     try:
@@ -474,7 +478,7 @@ async def process_upload(
 
     ft = get_file_type(filename)
     if ft is None:
-        ext = os.path.splitext(filename)[1].lower()
+        ext = _file_ext(filename)
         os.remove(file_path)
         raise ValueError(f"不支持的文件类型: {ext}")
 
@@ -601,10 +605,10 @@ def build_batch_zip(request: BatchDownloadRequest) -> tuple[bytes, str, dict[str
             logger.warning("Unable to read job item statuses for redacted ZIP", exc_info=True)
 
     for fid in unique_ids:
-        if fid not in file_store:
+        info = file_store.get(fid)
+        if info is None:
             skipped.append({"file_id": fid, "reason": "file_not_found"})
             continue
-        info = file_store[fid]
         original_filename = os.path.basename(info.get("original_filename", "file")) or "file"
         if request.redacted:
             item_status = (item_status_map.get(fid) or {}).get("status")
@@ -2,6 +2,7 @@
 文件解析服务
 支持 Word/PDF/图片 文件的内容提取
 """
+import asyncio
 import logging
 import os
 import sys
@@ -429,6 +430,19 @@ class FileParser:
         doc.close()
         return images
 
+    @staticmethod
+    def _render_pdf_page_png(resolved: str, page: int, dpi: int) -> bytes:
+        doc = fitz.open(resolved)
+        try:
+            if page < 1 or page > len(doc):
+                raise ValueError(f"页码超出范围: {page}")
+            pdf_page = doc.load_page(page - 1)
+            zoom = dpi / 72
+            pix = pdf_page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+            return pix.tobytes("png")
+        finally:
+            doc.close()
+
     async def get_pdf_page_image(self, file_path: str, page: int, dpi: int = 150) -> bytes:
         """获取 PDF 指定页的图片"""
         _validate_path(file_path)
@@ -450,19 +464,8 @@ class FileParser:
                     self.last_pdf_page_image_cache_hit = True
                     return cached
 
-        doc = fitz.open(resolved)
-
-        if page < 1 or page > len(doc):
-            doc.close()
-            raise ValueError(f"页码超出范围: {page}")
-
-        pdf_page = doc.load_page(page - 1)
-        zoom = dpi / 72
-        matrix = fitz.Matrix(zoom, zoom)
-        pix = pdf_page.get_pixmap(matrix=matrix)
-        img_data = pix.tobytes("png")
-
-        doc.close()
+        # 光栅化 + PNG 编码是纯 CPU 工作，放到线程池，避免阻塞事件循环
+        img_data = await asyncio.to_thread(self._render_pdf_page_png, resolved, page, dpi)
         if cache_limit > 0:
             with self._pdf_page_image_cache_lock:
                 self._pdf_page_image_cache[cache_key] = img_data
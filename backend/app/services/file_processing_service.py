@@ -7,6 +7,8 @@
 from __future__ import annotations
 
 import logging
+from collections import Counter
+from functools import lru_cache
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -18,6 +20,19 @@ def _store_and_lock():
     return file_store, _file_store_lock
 
 
+@lru_cache(maxsize=1)
+def _get_parser():
+    """首次调用时才导入 FileParser（连带 PyMuPDF / python-docx / PIL），之后复用同一实例。"""
+    from app.services.file_parser import FileParser
+
+    return FileParser()
+
+
+def _summarize_entities(entities: list) -> dict[str, int]:
+    """按实体类型计数；单个文件的实体只有几十到几百个，用 Counter 即可，不值得转成 numpy 数组。"""
+    return dict(Counter(ent.type for ent in entities))
+
+
 def _assign_pages_to_entities(entities: list, pages: list[str] | None) -> None:
     """Mutate each entity's `page` attribute based on `entity.start` offset.
 
@@ -67,7 +82,6 @@ async def parse_file(file_id: str) -> dict[str, Any]:
     Raises ValueError if file not found.
     """
     from app.models.schemas import FileType
-    from app.services.file_parser import FileParser
 
     file_store, _file_store_lock = _store_and_lock()
 
@@ -85,8 +99,7 @@ async def parse_file(file_id: str) -> dict[str, Any]:
         else file_type
     )
 
-    parser = FileParser()
-    result = await parser.parse(file_path, parser_file_type)
+    result = await _get_parser().parse(file_path, parser_file_type)
 
     async with _file_store_lock:
         if file_id in file_store:
@@ -174,10 +187,7 @@ async def run_hybrid_ner(file_id: str, entity_type_ids: list[str] | None = None)
 
     _assign_pages_to_entities(entities, snapshot.get("pages"))
 
-    entity_summary = {}
-    for ent in entities:
-        etype = ent.type
-        entity_summary[etype] = entity_summary.get(etype, 0) + 1
+    entity_summary = _summarize_entities(entities)
 
     async with _file_store_lock:
         if file_id in file_store:
@@ -237,10 +247,7 @@ async def run_default_ner(file_id: str, entity_type_ids: list[str] | None = None
 
     _assign_pages_to_entities(entities, snapshot.get("pages"))
 
-    entity_summary = {}
-    for ent in entities:
-        etype = ent.type
-        entity_summary[etype] = entity_summary.get(etype, 0) + 1
+    entity_summary = _summarize_entities(entities)
 
     async with _file_store_lock:
         if file_id in file_store:
@@ -21,16 +21,27 @@ from app.core.sqlite_base import connect_sqlite
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于部署环境
+    orjson = None
+    logger.debug("orjson not installed, file_store rows use stdlib json")
+
 _SCHEMA = """
 CREATE TABLE IF NOT EXISTS file_store (
     file_id TEXT PRIMARY KEY,
     data_json TEXT NOT NULL,
+    payload_json TEXT,
     created_at TEXT,
     updated_at TEXT
 );
 CREATE INDEX IF NOT EXISTS idx_fs_created ON file_store(created_at);
 """
 
+# 体积大、只有解析/识别/脱敏才需要的字段单独存放在 payload_json 列，
+# 列表与启动修复只读 data_json，不必反序列化整篇正文。
+_PAYLOAD_FIELDS = ("content", "pages")
+
 _RETRYABLE_SQLITE_MESSAGES = (
     "unable to open database file",
     "database is locked",
@@ -38,6 +49,34 @@ _RETRYABLE_SQLITE_MESSAGES = (
 )
 
 
+def _dumps(value: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _split_record(data: dict) -> tuple[str, str | None]:
+    """拆分为 (元数据 JSON, 正文 payload JSON)。"""
+    jsonable_data = to_jsonable(data)
+    payload = {key: jsonable_data.pop(key) for key in _PAYLOAD_FIELDS if key in jsonable_data}
+    data_json = _dumps(jsonable_data)
+    payload_json = _dumps(payload) if payload else None
+    return data_json, payload_json
+
+
+def _merge_record(data_json: str, payload_json: str | None) -> dict:
+    data = _loads(data_json)
+    if payload_json:
+        data.update(_loads(payload_json))
+    return data
+
+
 class FileStoreDB:
     """SQLite-backed file store with dict-like API.
 
@@ -49,7 +88,7 @@ class FileStoreDB:
         self._path = db_path
         self._lock = threading.Lock()
         self._item_cache: dict[str, dict] = {}
-        self._all_rows_cache: list[tuple[str, str]] | None = None
+        self._meta_rows_cache: list[tuple[str, str]] | None = None
         d = os.path.dirname(db_path)
         if d:
             os.makedirs(d, exist_ok=True)
@@ -63,28 +102,39 @@ class FileStoreDB:
         return connect_sqlite(self._path, timeout=10.0, busy_timeout_ms=5000, wal=True)
 
     def _invalidate_read_cache(self, file_id: str | None = None) -> None:
-        self._all_rows_cache = None
+        self._meta_rows_cache = None
         if file_id is None:
             self._item_cache.clear()
         else:
             self._item_cache.pop(file_id, None)
 
-    def _cached_all_rows(self) -> list[tuple[str, str]]:
+    def _cached_meta_rows(self) -> list[tuple[str, str]]:
         with self._lock:
-            if self._all_rows_cache is not None:
-                return list(self._all_rows_cache)
+            if self._meta_rows_cache is not None:
+                return list(self._meta_rows_cache)
 
         def op():
             with self._lock:
-                if self._all_rows_cache is not None:
-                    return list(self._all_rows_cache)
+                if self._meta_rows_cache is not None:
+                    return list(self._meta_rows_cache)
                 with self._connect() as conn:
                     rows = conn.execute("SELECT file_id, data_json FROM file_store").fetchall()
                 cached = [(r["file_id"], r["data_json"]) for r in rows]
-                self._all_rows_cache = cached
+                self._meta_rows_cache = cached
                 return list(cached)
 
-        return self._run_with_retry("items", op)
+        return self._run_with_retry("metadata_items", op)
+
+    def _all_rows(self) -> list[tuple[str, dict]]:
+        def op():
+            with self._lock:
+                with self._connect() as conn:
+                    return conn.execute(
+                        "SELECT file_id, data_json, payload_json FROM file_store"
+                    ).fetchall()
+
+        rows = self._run_with_retry("items", op)
+        return [(r["file_id"], _merge_record(r["data_json"], r["payload_json"])) for r in rows]
 
     def _run_with_retry(self, op_name: str, fn: Callable[[], Any]) -> Any:
         last_exc: sqlite3.OperationalError | None = None
@@ -113,6 +163,10 @@ class FileStoreDB:
             conn = self._connect()
             try:
                 conn.executescript(_SCHEMA)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(file_store)")}
+                if "payload_json" not in columns:
+                    # 旧库：正文仍留在 data_json 里，读取时兼容，下次写入时拆分
+                    conn.execute("ALTER TABLE file_store ADD COLUMN payload_json TEXT")
                 conn.commit()
             finally:
                 conn.close()
@@ -129,13 +183,13 @@ class FileStoreDB:
             with self._lock:
                 with self._connect() as conn:
                     return conn.execute(
-                        "SELECT data_json FROM file_store WHERE file_id = ?", (file_id,)
+                        "SELECT data_json, payload_json FROM file_store WHERE file_id = ?", (file_id,)
                     ).fetchone()
 
         row = self._run_with_retry("get", op)
         if not row:
             return None
-        data = json.loads(row["data_json"])
+        data = _merge_record(row["data_json"], row["payload_json"])
         with self._lock:
             self._item_cache[file_id] = deepcopy(data)
         return data
@@ -161,22 +215,21 @@ class FileStoreDB:
         self.set(file_id, data)
 
     def set(self, file_id: str, data: dict) -> None:
-        jsonable_data = to_jsonable(data)
-        data_json = json.dumps(jsonable_data, ensure_ascii=False, default=str)
+        data_json, payload_json = _split_record(data)
         created = data.get("created_at", "")
         def op() -> None:
             with self._lock:
                 with self._connect() as conn:
                     conn.execute(
                         """
-                        INSERT OR REPLACE INTO file_store (file_id, data_json, created_at, updated_at)
-                        VALUES (?, ?, ?, datetime('now'))
+                        INSERT OR REPLACE INTO file_store (file_id, data_json, payload_json, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, datetime('now'))
                         """,
-                        (file_id, data_json, created),
+                        (file_id, data_json, payload_json, created),
                     )
                     conn.commit()
                 self._invalidate_read_cache(file_id)
-                self._item_cache[file_id] = deepcopy(jsonable_data)
+                self._item_cache[file_id] = _merge_record(data_json, payload_json)
 
         self._run_with_retry("set", op)
 
@@ -206,15 +259,18 @@ class FileStoreDB:
         self.pop(file_id)
 
     def values(self) -> list[dict]:
-        rows = self._cached_all_rows()
-        return [json.loads(data_json) for _file_id, data_json in rows]
+        return [data for _file_id, data in self._all_rows()]
 
     def items(self) -> list[tuple[str, dict]]:
-        rows = self._cached_all_rows()
-        return [(file_id, json.loads(data_json)) for file_id, data_json in rows]
+        return self._all_rows()
+
+    def metadata_items(self) -> list[tuple[str, dict]]:
+        """与 items() 相同，但不含 content / pages 等正文字段；只读，不可据此整条写回。"""
+        rows = self._cached_meta_rows()
+        return [(file_id, _loads(data_json)) for file_id, data_json in rows]
 
     def keys(self) -> list[str]:
-        rows = self._cached_all_rows()
+        rows = self._cached_meta_rows()
         return [file_id for file_id, _data_json in rows]
 
     def __len__(self) -> int:
@@ -243,12 +299,13 @@ class FileStoreDB:
             with self._lock:
                 with self._connect() as conn:
                     for file_id, info in data.items():
-                        data_json = json.dumps(to_jsonable(info), ensure_ascii=False, default=str)
+                        data_json, payload_json = _split_record(info)
                         created = info.get("created_at", "")
                         conn.execute(
-                            "INSERT OR REPLACE INTO file_store (file_id, data_json, created_at, updated_at) "
-                            "VALUES (?, ?, ?, datetime('now'))",
-                            (file_id, data_json, created),
+                            "INSERT OR REPLACE INTO file_store "
+                            "(file_id, data_json, payload_json, created_at, updated_at) "
+                            "VALUES (?, ?, ?, ?, datetime('now'))",
+                            (file_id, data_json, payload_json, created),
                         )
                     conn.commit()
                 self._invalidate_read_cache()
@@ -270,12 +327,11 @@ class FileStoreDB:
             return 0
         if not isinstance(old_data, dict):
             return 0
-        count = 0
-        for file_id, info in old_data.items():
-            if not isinstance(info, dict):
-                continue
-            self.set(file_id, info)
-            count += 1
+        # 一个事务批量写入，而不是每条记录各提交一次
+        entries = {file_id: info for file_id, info in old_data.items() if isinstance(info, dict)}
+        if entries:
+            self.update(entries)
+        count = len(entries)
         logger.info("Migrated %d files from JSON to SQLite file_store", count)
         # 备份旧文件
         backup = json_path + ".migrated"
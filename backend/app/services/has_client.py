@@ -112,6 +112,10 @@ class HaSClient:
             payload["max_tokens"] = max(32, int(max_tokens))
         if settings.HAS_TEXT_MODEL_NAME:
             payload["model"] = settings.HAS_TEXT_MODEL_NAME
+        if settings.HAS_NER_CACHE_PROMPT and settings.HAS_TEXT_RUNTIME.strip().lower() != "vllm":
+            # 提示词中类型清单与说明在前、正文在后，llama.cpp 可复用公共前缀的 KV cache；
+            # vLLM 由服务端 prefix caching 处理，不需要（也不识别）该字段
+            payload["cache_prompt"] = True
         started = time.perf_counter()
         response = retry_sync(
             self._do_chat_request, base, payload,
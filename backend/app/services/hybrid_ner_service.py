@@ -9,6 +9,7 @@
 4. 浜ゅ弶楠岃瘉锛氬幓閲嶅悎骞讹紝鎻愰珮鍑嗙‘鐜?
 """
 
+import asyncio
 import logging
 import re
 
@@ -17,9 +18,9 @@ from dataclasses import dataclass
 from types import SimpleNamespace
 from typing import Any
 
-from app.core.safe_regex import RegexTimeoutError, safe_compile, safe_finditer
 from app.models.schemas import Entity
 from app.models.type_mapping import canonical_type_id, linkage_groups_for_type
+from app.services import entity_types_compiler
 from app.services.has_service import HaSService, has_service
 
 # 绫诲瀷鍒悕锛屽吋瀹?EntityTypeConfig 鍜?CustomEntityType
@@ -233,7 +234,8 @@ class HybridNERService:
         custom_regex_types = self._select_custom_regex_types(entity_types)
         if custom_regex_types:
             logger.info("Stage 2: user-defined regex fallback...")
-            regex_entities = self._custom_regex_extract(text, custom_regex_types)
+            # 正则扫描与交叉验证是纯 CPU 工作，放到线程池执行，避免阻塞事件循环
+            regex_entities = await asyncio.to_thread(self._custom_regex_extract, text, custom_regex_types)
             all_entities.extend(regex_entities)
             logger.info("  Custom regex found %d entities", len(regex_entities))
         else:
@@ -241,7 +243,9 @@ class HybridNERService:
 
         # Stage 3: 浜ゅ弶楠岃瘉 + 鎸囦唬娑堣В
         logger.info("Stage 3: validation and coreference...")
-        validated_entities = self._cross_validate(all_entities, text, enabled_type_ids)
+        validated_entities = await asyncio.to_thread(
+            self._cross_validate, all_entities, text, enabled_type_ids,
+        )
         logger.info("  Kept %d entities after validation", len(validated_entities))
 
         # Prometheus: NER 寤惰繜 + 瀹炰綋鏁?
@@ -270,31 +274,24 @@ class HybridNERService:
         custom_regex_types: list[EntityTypeConfig],
     ) -> list[Entity]:
         entities: list[Entity] = []
-        for entity_type in custom_regex_types:
-            raw_type_id = str(getattr(entity_type, "id", "") or "").strip()
-            pattern = str(getattr(entity_type, "regex_pattern", "") or "").strip()
-            if not raw_type_id or not pattern:
-                continue
-            try:
-                compiled = safe_compile(pattern, timeout=1.0)
-                matches = safe_finditer(compiled, text, timeout=2.0)
-            except (re.error, RegexTimeoutError) as exc:
-                logger.warning("Custom regex skipped for %s: %s", raw_type_id, exc)
-                continue
-            for index, match in enumerate(matches):
-                matched_text = match.group()
-                if not matched_text:
-                    continue
-                entities.append(Entity(
-                    id=f"regex_{raw_type_id}_{index}",
-                    text=matched_text,
-                    type=raw_type_id,
-                    start=match.start(),
-                    end=match.end(),
-                    page=1,
-                    confidence=0.96,
-                    source="regex",
-                ))
+        counters: dict[str, int] = {}
+        # 所有类型的正则合并为一个扫描器，每篇文档只扫描一次
+        for raw_type_id, start, end in entity_types_compiler.scan(text, custom_regex_types):
+            matched_text = text[start:end]
+            if not matched_text:
+                continue
+            index = counters.get(raw_type_id, 0)
+            counters[raw_type_id] = index + 1
+            entities.append(Entity(
+                id=f"regex_{raw_type_id}_{index}",
+                text=matched_text,
+                type=raw_type_id,
+                start=start,
+                end=end,
+                page=1,
+                confidence=0.96,
+                source="regex",
+            ))
         return entities
 
     @staticmethod
@@ -1363,7 +1363,7 @@ async def commit_review(
     Raises ValueError on errors.
     """
     from app.services.file_management_service import _file_store_lock, file_store
-    from app.services.redactor import Redactor
+    from app.services.redactor import get_redactor
 
     job, item = get_job_and_item(store, job_id, item_id)
     if item["status"] in (JobItemStatus.CANCELLED.value, JobItemStatus.FAILED.value):
@@ -1388,7 +1388,7 @@ async def commit_review(
     config = build_redaction_config(job)
 
     try:
-        redactor = Redactor()
+        redactor = get_redactor()
         result = await redactor.redact(
             file_info=file_info,
             entities=entities,
@@ -6,9 +6,10 @@
 from __future__ import annotations
 
 import logging
+import os
 
 from app.core.config import settings
-from app.core.persistence import load_json, save_json
+from app.core.persistence import save_json
 from app.models.schemas import ModelConfig, ModelConfigList
 
 logger = logging.getLogger(__name__)
@@ -176,8 +177,7 @@ async def _probe_local_http_health(
     base = base_url.rstrip("/")
     health_url = f"{base}/health"
     try:
-        async with httpx.AsyncClient(timeout=timeout, trust_env=False) as client:
-            resp = await client.get(health_url)
+        resp = await _get_http_client().get(health_url, timeout=timeout)
     except httpx.TimeoutException:
         if _tcp_port_open(health_url):
             return _preflight_result(
@@ -335,25 +335,58 @@ def _sanitize_model_config_list(raw: ModelConfigList) -> tuple[ModelConfigList,
 
 # ── 持久化 ────────────────────────────────────────────────
 
-def load_configs() -> ModelConfigList:
-    """加载配置；自动迁移并移除已废弃的 GLM 视觉配置项"""
-    raw = load_json(settings.MODEL_CONFIG_PATH, default=None)
-    if raw is not None:
-        try:
-            lst = ModelConfigList(**raw)
-            lst, changed = _sanitize_model_config_list(lst)
-            if changed:
-                save_configs(lst)
-                logger.info("ModelConfig 已迁移：移除旧版 GLM 视觉配置，保留 HaS Image 等条目")
+# 已解析的配置文件：((st_mtime_ns, st_size), 解析+迁移后的配置)；文件未变化时不再重复解析
+_parsed_cache: tuple[tuple[int, int], ModelConfigList] | None = None
+
+
+def _stat_key(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _cached_configs() -> ModelConfigList:
+    """进程内共享的配置对象（只读！）；配置文件未变化时不重新解析。"""
+    global _parsed_cache
+    path = settings.MODEL_CONFIG_PATH
+    key = _stat_key(path)
+    if key is None:
+        return DEFAULT_CONFIGS
+    cached = _parsed_cache
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        with open(path, "rb") as f:
+            lst = ModelConfigList.model_validate_json(f.read())
+        lst, changed = _sanitize_model_config_list(lst)
+        if changed:
+            save_configs(lst)
+            logger.info("ModelConfig 已迁移：移除旧版 GLM 视觉配置，保留 HaS Image 等条目")
             return lst
-        except Exception as e:
-            logger.error("ModelConfig 加载配置失败: %s", e)
-    return DEFAULT_CONFIGS.model_copy(deep=True)
+        _parsed_cache = (key, lst)
+        return lst
+    except Exception as e:
+        logger.error("ModelConfig 加载配置失败: %s", e)
+    return DEFAULT_CONFIGS
+
+
+def load_configs() -> ModelConfigList:
+    """加载配置；自动迁移并移除已废弃的 GLM 视觉配置项（返回副本，调用方可自由修改）"""
+    # ModelConfig 不可变，只需复制列表本身，调用方增删条目不会影响缓存
+    cached = _cached_configs()
+    return cached.model_copy(update={"configs": list(cached.configs)})
 
 
 def save_configs(configs: ModelConfigList) -> None:
-    """保存配置"""
+    """保存配置，并同步刷新进程内缓存（写入后无需再读盘解析）"""
+    global _parsed_cache
     save_json(settings.MODEL_CONFIG_PATH, configs)
+    key = _stat_key(settings.MODEL_CONFIG_PATH)
+    _parsed_cache = (
+        (key, configs.model_copy(update={"configs": list(configs.configs)})) if key is not None else None
+    )
 
 
 # ── 业务方法 ──────────────────────────────────────────────
@@ -367,7 +400,8 @@ def get_active() -> ModelConfig | None:
 
 
 def get_active_has_image_config() -> ModelConfig | None:
-    configs = load_configs()
+    # 只读查找直接用共享缓存（ModelConfig 不可变，无需复制）
+    configs = _cached_configs()
     if configs.active_id:
         for cfg in configs.configs:
             if cfg.id == configs.active_id and is_has_image_runtime_config(cfg):
@@ -379,7 +413,7 @@ def get_active_has_image_config() -> ModelConfig | None:
 
 
 def get_config(config_id: str) -> ModelConfig | None:
-    for cfg in load_configs().configs:
+    for cfg in _cached_configs().configs:
         if cfg.id == config_id:
             return cfg
     return None
@@ -449,11 +483,12 @@ def create_config(config: ModelConfig) -> tuple[bool, str]:
 def update_config(config_id: str, config: ModelConfig) -> tuple[ModelConfig | None, str]:
     """Returns (updated_config_or_None, error_message)."""
     configs = load_configs()
+    overrides: dict = {"id": config_id}
     if config_id in VISION_BUILTIN_IDS:
-        config.enabled = True
+        overrides["enabled"] = True
+    config = config.model_copy(update=overrides)
     for i, cfg in enumerate(configs.configs):
         if cfg.id == config_id:
-            config.id = config_id
             configs.configs[i] = config
             if configs.active_id == config_id and not is_has_image_runtime_config(config):
                 configs.active_id = next(
@@ -492,6 +527,30 @@ def reset_configs() -> None:
 
 # ── 健康探测 ──────────────────────────────────────────────
 
+_http_client = None  # httpx.AsyncClient，首次探测时创建
+
+
+def _get_http_client():
+    """探测共用一个 AsyncClient，复用连接池；超时按请求传入。"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        import httpx
+
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            trust_env=False,
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 async def _probe_paddle_ocr_health(base_override: str | None = None) -> dict:
     """探测 PaddleOCR-VL：GET /health，检查 ready。"""
     base = (base_override or settings.OCR_BASE_URL).rstrip("/")
@@ -511,13 +570,7 @@ async def test_paddle_ocr() -> dict:
 
 async def test_config(config_id: str) -> tuple[dict | None, str]:
     """Returns (result_dict_or_None, error_message). None means config not found."""
-    configs = load_configs()
-
-    config = None
-    for cfg in configs.configs:
-        if cfg.id == config_id:
-            config = cfg
-            break
+    config = get_config(config_id)
 
     if not config:
         return None, "配置不存在"
@@ -545,7 +598,6 @@ async def test_config(config_id: str) -> tuple[dict | None, str]:
             ), ""
 
         elif config.provider in ["openai", "custom"]:
-            import httpx
             headers = {}
             if config.api_key:
                 headers["Authorization"] = f"Bearer {config.api_key}"
@@ -558,8 +610,7 @@ async def test_config(config_id: str) -> tuple[dict | None, str]:
                     provider=config.provider,
                     base_url="",
                 ), ""
-            async with httpx.AsyncClient(timeout=10.0, trust_env=False) as client:
-                resp = await client.get(f"{base}/v1/models", headers=headers)
+            resp = await _get_http_client().get(f"{base}/v1/models", headers=headers)
             if resp.status_code == 200:
                 return _preflight_result(
                     success=True,
@@ -6,10 +6,15 @@
 
 from __future__ import annotations
 
+import contextlib
+import logging
 import os as _os
+from collections.abc import Iterable, Mapping
 from enum import Enum
+from operator import attrgetter
+from types import MappingProxyType
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 from app.core.config import settings
 from app.core.has_image_categories import (
@@ -17,7 +22,9 @@ from app.core.has_image_categories import (
     is_has_image_model_slug,
     normalize_visual_slug,
 )
-from app.core.persistence import load_json, save_json
+from app.core.persistence import append_jsonl, load_json, load_jsonl, save_json
+
+logger = logging.getLogger(__name__)
 
 # ── 数据模型 ──────────────────────────────────────────────
 
@@ -43,7 +50,9 @@ class VlmFewShotSample(BaseModel):
 
 
 class PipelineTypeConfig(BaseModel):
-    """Pipeline 下的类型配置"""
+    """Pipeline 下的类型配置（不可变：修改时整体替换，预置实例可安全共享）"""
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="唯一ID")
     name: str = Field(..., description="显示名称")
     data_domain: str = Field(default="custom_extension", description="L1 data domain")
@@ -82,17 +91,19 @@ _PIPELINE_JSON_PATH = _os.path.join(
     _os.path.dirname(__file__), "..", "..", "config", "preset_pipeline_types.json"
 )
 _raw_pipeline = load_json(_PIPELINE_JSON_PATH, default={})
-PRESET_OCR_HAS_TYPES: list[PipelineTypeConfig] = [
+# 预置项只读：类型实例 frozen、容器为 tuple / MappingProxyType，
+# 运行时副本由 _fresh_presets() 生成，预置本身永远不会被改写
+PRESET_OCR_HAS_TYPES: tuple[PipelineTypeConfig, ...] = tuple(
     PipelineTypeConfig(**item) for item in _raw_pipeline.get("ocr_has", [])
-]
-PRESET_HAS_IMAGE_TYPES: list[PipelineTypeConfig] = [
+)
+PRESET_HAS_IMAGE_TYPES: tuple[PipelineTypeConfig, ...] = tuple(
     PipelineTypeConfig(**item) for item in _raw_pipeline.get("has_image", [])
-]
-PRESET_VLM_TYPES: list[PipelineTypeConfig] = [
+)
+PRESET_VLM_TYPES: tuple[PipelineTypeConfig, ...] = tuple(
     PipelineTypeConfig(**item) for item in _raw_pipeline.get("vlm", [])
-]
+)
 
-PRESET_PIPELINES: dict[str, PipelineConfig] = {
+PRESET_PIPELINES: Mapping[str, PipelineConfig] = MappingProxyType({
     "ocr_has": PipelineConfig(
         mode=PipelineMode.OCR_HAS,
         name="文本识别（Structure + HaS Text）",
@@ -114,7 +125,12 @@ PRESET_PIPELINES: dict[str, PipelineConfig] = {
         enabled=True,
         types=PRESET_VLM_TYPES,
     ),
-}
+})
+
+# 各模式预置类型 ID，导入时一次算好；删除校验只做集合查找
+PRESET_TYPE_IDS: Mapping[str, frozenset[str]] = MappingProxyType({
+    mode: frozenset(t.id for t in pipeline.types) for mode, pipeline in PRESET_PIPELINES.items()
+})
 
 OCR_HAS_VISUAL_DEPRECATED_IDS = {
     "SEAL",
@@ -132,6 +148,11 @@ HAS_IMAGE_PAPER_DEFAULT_DISABLED_MIGRATION = "has_image_paper_default_disabled"
 
 # ── 磁盘快照合并 ─────────────────────────────────────────
 
+def _fresh_presets() -> dict[str, PipelineConfig]:
+    """预置配置的可写副本：只复制 PipelineConfig 与 types 列表，类型实例（frozen）共享。"""
+    return {k: v.model_copy(update={"types": list(v.types)}) for k, v in PRESET_PIPELINES.items()}
+
+
 def _validate_pipeline_type_for_mode(mode: str, type_config: PipelineTypeConfig) -> str:
     if mode == "has_image" and not is_has_image_model_slug(type_config.id):
         return "HaS Image is fixed to the 21 model classes"
@@ -178,8 +199,8 @@ def merge_pipeline_disk_snapshot(raw: dict | None) -> dict[str, PipelineConfig]:
     else:
         raw = None
     if not raw:
-        return {k: v.model_copy(deep=True) for k, v in PRESET_PIPELINES.items()}
-    pipelines: dict[str, PipelineConfig] = {k: v.model_copy(deep=True) for k, v in PRESET_PIPELINES.items()}
+        return _fresh_presets()
+    pipelines: dict[str, PipelineConfig] = _fresh_presets()
 
     def reconcile_types(base: PipelineConfig, loaded: PipelineConfig) -> list[PipelineTypeConfig]:
         loaded_by_id = {item.id: item for item in loaded.types}
@@ -214,7 +235,7 @@ def merge_pipeline_disk_snapshot(raw: dict | None) -> dict[str, PipelineConfig]:
         try:
             if isinstance(value, dict) and value.get("mode") == "glm_vision":
                 value = {**value, "mode": "has_image"}
-            loaded = PipelineConfig(**value)
+            loaded = PipelineConfig.model_validate(value)
         except Exception:
             continue
         if key in pipelines:
@@ -230,13 +251,85 @@ def merge_pipeline_disk_snapshot(raw: dict | None) -> dict[str, PipelineConfig]:
 
 
 # ── 持久化 ────────────────────────────────────────────────
+# 快照（PIPELINE_STORE_PATH）+ 追加式变更日志（.log，每行一个 delta）。
+# 每次修改只追加一行；启动时在快照上重放日志，日志超过阈值或关闭服务时
+# 写出新快照并清空日志。delta 均为幂等的绝对值操作，重复重放不会出错。
+
+_LOG_COMPACT_BYTES = 256 * 1024
+
+
+def _log_path() -> str:
+    return f"{settings.PIPELINE_STORE_PATH}.log"
+
+
+def _type_position(pipeline: PipelineConfig, type_id: str, positions: dict[str, int] | None) -> int | None:
+    if positions is not None:
+        return positions.get(type_id)
+    return next((i for i, t in enumerate(pipeline.types) if t.id == type_id), None)
+
+
+def _apply_delta(
+    pipelines: dict[str, PipelineConfig],
+    delta: dict,
+    positions: dict[str, int] | None = None,
+) -> str | None:
+    """把一条 delta 应用到 pipelines（原地修改），返回受影响的模式；None 表示全部。
+
+    positions 为该模式 id → 列表下标（_type_positions）；提供时按下标直接定位，
+    否则（启动重放，索引尚未建立）线性查找。
+    """
+    op = delta.get("op")
+    if op == "reset":
+        pipelines.clear()
+        pipelines.update(_fresh_presets())
+        return None
+    mode = delta["mode"]
+    pipeline = pipelines.get(mode)
+    if pipeline is None:
+        return mode
+    if op == "set_pipeline_enabled":
+        pipeline.enabled = bool(delta["enabled"])
+    elif op == "put_type":
+        new_type = PipelineTypeConfig.model_validate(delta["type"])
+        # 原 ID 或新 ID 的已有条目合并为一条（保持第一条的位置），保证重放幂等
+        ids = {delta.get("replaces") or new_type.id, new_type.id}
+        if positions is not None:
+            hits = sorted(positions[type_id] for type_id in ids if type_id in positions)
+        else:
+            hits = [i for i, t in enumerate(pipeline.types) if t.id in ids]
+        if not hits:
+            pipeline.types.append(new_type)
+        else:
+            pipeline.types[hits[0]] = new_type
+            for i in reversed(hits[1:]):
+                del pipeline.types[i]
+    elif op == "set_type_enabled":
+        i = _type_position(pipeline, delta["id"], positions)
+        if i is not None:
+            t = pipeline.types[i]
+            pipeline.types[i] = t.model_copy(update={"enabled": bool(delta["enabled"])})
+    elif op == "delete_type":
+        i = _type_position(pipeline, delta["id"], positions)
+        if i is not None:
+            del pipeline.types[i]
+    else:
+        raise ValueError(f"unknown pipeline delta op: {op!r}")
+    return mode
+
 
 def _load_pipelines() -> dict[str, PipelineConfig]:
     raw = load_json(settings.PIPELINE_STORE_PATH, default=None)
-    return merge_pipeline_disk_snapshot(raw if isinstance(raw, dict) else None)
+    pipelines = merge_pipeline_disk_snapshot(raw if isinstance(raw, dict) else None)
+    for delta in load_jsonl(_log_path()):
+        try:
+            _apply_delta(pipelines, delta)
+        except Exception:
+            logger.warning("Skipping invalid pipeline delta: %r", delta)
+    return pipelines
 
 
-def _persist_pipelines() -> None:
+def _write_pipelines() -> None:
+    # 启动时若快照已是最新（无变更日志、预置未变），内容一致则不重写
     save_json(
         settings.PIPELINE_STORE_PATH,
         {
@@ -245,12 +338,84 @@ def _persist_pipelines() -> None:
                 HAS_IMAGE_PAPER_DEFAULT_DISABLED_MIGRATION: True,
             },
         },
+        skip_unchanged=True,
     )
 
 
+def _compact() -> None:
+    """写出完整快照，然后清空变更日志（先快照后删日志，中途崩溃只会多重放一遍）。"""
+    _write_pipelines()
+    with contextlib.suppress(FileNotFoundError):
+        _os.remove(_log_path())
+
+
+def flush_pipelines() -> None:
+    """把变更日志合并进快照（关闭服务时调用）。"""
+    if _os.path.exists(_log_path()):
+        _compact()
+
+
+def _commit(delta: dict) -> None:
+    """应用 delta、刷新索引，并追加到变更日志。"""
+    global _db_version
+    _db_version += 1
+    mode = _apply_delta(pipelines_db, delta, _type_positions.get(delta.get("mode")))
+    if mode is None:
+        types_index.clear()
+        _type_positions.clear()
+        _enabled_types.clear()
+    _reindex(mode)
+    try:
+        size = append_jsonl(_log_path(), delta)
+    except OSError:
+        logger.exception("Appending pipeline delta failed; writing full snapshot instead")
+        _compact()
+        return
+    if size >= _LOG_COMPACT_BYTES:
+        _compact()
+
+
+def _bump(mode: str) -> None:
+    """类型内容变动：使该模式的排序缓存失效。"""
+    _version[mode] = _version.get(mode, 0) + 1
+
+
+def _reindex(mode: str | None = None) -> None:
+    """重建 mode → id → 类型 的索引；类型列表变动后调用（mode=None 时全部重建）。"""
+    modes = [mode] if mode is not None else list(pipelines_db)
+    for key in modes:
+        _bump(key)
+        pipeline = pipelines_db.get(key)
+        if pipeline is None:
+            types_index.pop(key, None)
+            _type_positions.pop(key, None)
+            _enabled_types.pop(key, None)
+        else:
+            types_index[key] = {t.id: t for t in pipeline.types}
+            # 下标取自类型列表本身（重复 ID 时与 types_index 一样以最后一条为准）
+            _type_positions[key] = {t.id: i for i, t in enumerate(pipeline.types)}
+            _enabled_types[key] = tuple(t for t in pipeline.types if t.enabled)
+
+
 # 内存存储（启动时从磁盘恢复）
 pipelines_db: dict[str, PipelineConfig] = _load_pipelines()
-_persist_pipelines()
+types_index: dict[str, dict[str, PipelineTypeConfig]] = {}
+_type_positions: dict[str, dict[str, int]] = {}
+# mode → 已启用类型（配置顺序），识别路径每张图都会读取
+_enabled_types: dict[str, tuple[PipelineTypeConfig, ...]] = {}
+_version: dict[str, int] = {}
+# (mode, enabled_only) → (version, 按 order 排好序的类型列表)
+_types_cache: dict[tuple[str, bool], tuple[int, list[PipelineTypeConfig]]] = {}
+# 任意修改都会递增；GET /vision-pipelines 的序列化结果按此缓存
+_db_version = 0
+_pipelines_json_cache: dict[bool, tuple[int, bytes]] = {}
+_PIPELINE_LIST_ADAPTER = TypeAdapter(list[PipelineConfig])
+# (mode, enabled_only) → (version, GET /vision-pipelines/{mode}/types 的 JSON 字节)
+_types_json_cache: dict[tuple[str, bool], tuple[int, bytes]] = {}
+_TYPE_LIST_ADAPTER = TypeAdapter(list[PipelineTypeConfig])
+_BY_ORDER = attrgetter("order")
+_reindex()
+_compact()
 
 
 # ── 公共查询 ──────────────────────────────────────────────
@@ -259,19 +424,44 @@ def get_pipeline_types_for_mode(mode: str, *, enabled_only: bool = True) -> list
     """获取指定模式下的类型配置。默认只返回启用项；显式选择校验可读取全部项。"""
     if mode not in pipelines_db:
         return []
-    types = pipelines_db[mode].types
     if enabled_only:
-        types = [t for t in types if t.enabled]
-    return list(types)
+        return list(_enabled_types.get(mode, ()))
+    return list(pipelines_db[mode].types)
+
+
+def select_pipeline_types(
+    mode: str,
+    type_ids: Iterable[str],
+    *,
+    enabled_only: bool = True,
+) -> list[PipelineTypeConfig]:
+    """按 ID 选取类型（集合交集 + 索引查找），结果保持配置中的顺序；未知 ID 忽略。"""
+    index = types_index.get(mode)
+    if not index:
+        return []
+    selected = [index[type_id] for type_id in index.keys() & set(type_ids)]
+    if enabled_only:
+        selected = [t for t in selected if t.enabled]
+    positions = _type_positions[mode]
+    selected.sort(key=lambda t: positions[t.id])
+    return selected
 
 
 # ── 业务方法 ──────────────────────────────────────────────
 
 def list_pipelines(enabled_only: bool = False) -> list[PipelineConfig]:
-    pipelines = list(pipelines_db.values())
     if enabled_only:
-        pipelines = [p for p in pipelines if p.enabled]
-    return pipelines
+        return [p for p in pipelines_db.values() if p.enabled]
+    return list(pipelines_db.values())
+
+
+def get_pipelines_serialized(enabled_only: bool = False) -> bytes:
+    """list_pipelines 的 JSON 字节，配置未变时直接复用。"""
+    cached = _pipelines_json_cache.get(enabled_only)
+    if cached is None or cached[0] != _db_version:
+        cached = (_db_version, _PIPELINE_LIST_ADAPTER.dump_json(list_pipelines(enabled_only)))
+        _pipelines_json_cache[enabled_only] = cached
+    return cached[1]
 
 
 def get_pipeline(mode: str) -> PipelineConfig | None:
@@ -282,19 +472,37 @@ def toggle_pipeline(mode: str) -> bool | None:
     """Returns new enabled state, or None if not found."""
     if mode not in pipelines_db:
         return None
-    pipelines_db[mode].enabled = not pipelines_db[mode].enabled
-    _persist_pipelines()
-    return pipelines_db[mode].enabled
+    enabled = not pipelines_db[mode].enabled
+    _commit({"op": "set_pipeline_enabled", "mode": mode, "enabled": enabled})
+    return enabled
 
 
 def get_pipeline_types(mode: str, enabled_only: bool = True) -> list[PipelineTypeConfig] | None:
     """Returns sorted types list, or None if pipeline not found."""
     if mode not in pipelines_db:
         return None
-    types = pipelines_db[mode].types
-    if enabled_only:
-        types = [t for t in types if t.enabled]
-    return sorted(types, key=lambda t: t.order)
+    version = _version.get(mode, 0)
+    cached = _types_cache.get((mode, enabled_only))
+    if cached is None or cached[0] != version:
+        types = pipelines_db[mode].types
+        if enabled_only:
+            types = (t for t in types if t.enabled)
+        cached = (version, sorted(types, key=_BY_ORDER))
+        _types_cache[(mode, enabled_only)] = cached
+    return list(cached[1])
+
+
+def get_pipeline_types_serialized(mode: str, enabled_only: bool = True) -> bytes | None:
+    """get_pipeline_types 的 JSON 字节，按模式版本缓存；Pipeline 不存在时返回 None。"""
+    if mode not in pipelines_db:
+        return None
+    key = (mode, enabled_only)
+    version = _version.get(mode, 0)
+    cached = _types_json_cache.get(key)
+    if cached is None or cached[0] != version:
+        cached = (version, _TYPE_LIST_ADAPTER.dump_json(get_pipeline_types(mode, enabled_only)))
+        _types_json_cache[key] = cached
+    return cached[1]
 
 
 def add_pipeline_type(mode: str, type_config: PipelineTypeConfig) -> tuple[PipelineTypeConfig | None, str]:
@@ -305,11 +513,9 @@ def add_pipeline_type(mode: str, type_config: PipelineTypeConfig) -> tuple[Pipel
     if validation_error:
         return None, validation_error
     type_config = _canonicalize_pipeline_type_for_mode(mode, type_config)
-    existing_ids = [t.id for t in pipelines_db[mode].types]
-    if type_config.id in existing_ids:
+    if type_config.id in types_index[mode]:
         return None, "类型 ID 已存在"
-    pipelines_db[mode].types.append(type_config)
-    _persist_pipelines()
+    _commit({"op": "put_type", "mode": mode, "type": type_config.model_dump(mode="json")})
     return type_config, ""
 
 
@@ -321,41 +527,42 @@ def update_pipeline_type(mode: str, type_id: str, type_config: PipelineTypeConfi
     if validation_error:
         return None, validation_error
     type_config = _canonicalize_pipeline_type_for_mode(mode, type_config)
-    for i, t in enumerate(pipelines_db[mode].types):
-        if t.id == type_id:
-            pipelines_db[mode].types[i] = type_config
-            _persist_pipelines()
-            return type_config, ""
-    return None, "类型不存在"
+    if type_id not in types_index[mode]:
+        return None, "类型不存在"
+    # 改名到已有 ID 会在合并时吞掉另一条类型（含预置类型），与新增时一样拒绝
+    if type_config.id != type_id and type_config.id in types_index[mode]:
+        return None, "类型 ID 已存在"
+    _commit({
+        "op": "put_type",
+        "mode": mode,
+        "replaces": type_id,
+        "type": type_config.model_dump(mode="json"),
+    })
+    return type_config, ""
 
 
 def toggle_pipeline_type(mode: str, type_id: str) -> tuple[bool | None, str]:
     """Returns (new_enabled_state, error_message). None means not found."""
     if mode not in pipelines_db:
         return None, "Pipeline 不存在"
-    for t in pipelines_db[mode].types:
-        if t.id == type_id:
-            t.enabled = not t.enabled
-            _persist_pipelines()
-            return t.enabled, ""
-    return None, "类型不存在"
+    t = types_index[mode].get(type_id)
+    if t is None:
+        return None, "类型不存在"
+    enabled = not t.enabled
+    _commit({"op": "set_type_enabled", "mode": mode, "id": type_id, "enabled": enabled})
+    return enabled, ""
 
 
 def delete_pipeline_type(mode: str, type_id: str) -> tuple[bool, str]:
     """Returns (success, error_message)."""
     if mode not in pipelines_db:
         return False, "Pipeline 不存在"
-    preset_ids = [t.id for t in PRESET_PIPELINES.get(mode, PipelineConfig(
-        mode=PipelineMode.OCR_HAS, name="", description="", types=[]
-    )).types]
-    if type_id in preset_ids:
+    if type_id in PRESET_TYPE_IDS.get(mode, frozenset()):
         return False, "预置类型不能删除，只能禁用"
-    pipelines_db[mode].types = [t for t in pipelines_db[mode].types if t.id != type_id]
-    _persist_pipelines()
+    if type_id in types_index[mode]:
+        _commit({"op": "delete_type", "mode": mode, "id": type_id})
     return True, ""
 
 
 def reset_pipelines() -> None:
-    global pipelines_db
-    pipelines_db = {k: v.model_copy(deep=True) for k, v in PRESET_PIPELINES.items()}
-    _persist_pipelines()
+    _commit({"op": "reset"})
@@ -152,13 +152,13 @@ class RedactionContext:
         if entity.text in self.structured_tag_map:
             return self.structured_tag_map[entity.text]
 
-        template = self._get_tag_template(type_key)
-        if template:
+        cfg = self._get_type_config(type_key)
+        if cfg is not None and getattr(cfg, "tag_template", None):
             if type_key not in self.type_counters:
                 self.type_counters[type_key] = 0
             self.type_counters[type_key] += 1
             index = self.type_counters[type_key]
-            return template.replace("{index}", f"{index:03d}")
+            return cfg.render_tag(index)
 
         structured_map = {
             "PERSON": ("人物", "个人.姓名"),
@@ -200,16 +200,6 @@ class RedactionContext:
         label = self._get_type_label(type_key) or type_key
         return f"<{label}[{index:03d}].完整名称>"
 
-    def _get_tag_template(self, type_key: str) -> str | None:
-        try:
-            from app.services.entity_type_service import entity_types_db
-            cfg = entity_types_db.get(type_key)
-            if cfg and getattr(cfg, "tag_template", None):
-                return cfg.tag_template
-        except (ImportError, KeyError, AttributeError):
-            return None
-        return None
-
     def _get_type_label(self, type_key: str) -> str | None:
         cfg = self._get_type_config(type_key)
         name = str(getattr(cfg, "name", "") or "").strip() if cfg else ""
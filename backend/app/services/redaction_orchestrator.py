@@ -9,6 +9,7 @@
 """
 from __future__ import annotations
 
+import asyncio
 import base64
 import logging
 import os
@@ -32,8 +33,8 @@ from app.models.schemas import (
     VisionResult,
 )
 from app.services.redaction.image_redactor import prepare_image_redaction
-from app.services.redactor import Redactor, build_preview_entity_map
-from app.services.vision_service import VisionService
+from app.services.redactor import build_preview_entity_map, get_redactor
+from app.services.vision_service import VisionService, _initial_pipeline_status, get_vision_service
 
 logger = logging.getLogger(__name__)
 
@@ -145,6 +146,14 @@ def _cached_vision_result(
     )
 
 
+def _page_map(info: dict[str, Any], key: str) -> dict:
+    """info[key] 作为按页字典返回；缺失或类型不对时重置为空字典。"""
+    value = info.get(key)
+    if not isinstance(value, dict):
+        value = info[key] = {}
+    return value
+
+
 def _boxes_from_page(raw_boxes: Any, page: int) -> list[BoundingBox]:
     if not isinstance(raw_boxes, list):
         return []
@@ -171,12 +180,11 @@ async def execute_redaction(request: RedactionRequest) -> RedactionResult:
     lock = _get_file_store_lock()
     file_id = request.file_id
 
-    if file_id not in file_store:
+    file_info = file_store.get(file_id)
+    if file_info is None:
         raise ValueError("文件不存在")
 
-    file_info = file_store[file_id]
-
-    redactor = Redactor()
+    redactor = get_redactor()
     result = await redactor.redact(
         file_info=file_info,
         entities=request.entities,
@@ -210,7 +218,8 @@ async def execute_redaction(request: RedactionRequest) -> RedactionResult:
             if "redaction_history" not in info:
                 info["redaction_history"] = []
             info["redaction_history"].append(version_entry)
-            file_store.set(file_id, info)
+            # 编码 + SQLite 提交放到线程里，不阻塞事件循环
+            await asyncio.to_thread(file_store.set, file_id, info)
 
     response = RedactionResult(
         file_id=file_id,
@@ -250,14 +259,13 @@ async def preview_image(
     """Generate preview redaction image. Raises ValueError if file not found."""
     file_store = _get_file_store()
 
-    if file_id not in file_store:
+    file_info = file_store.get(file_id)
+    if file_info is None:
         raise ValueError("file not found")
-
-    file_info = file_store[file_id]
     file_path = file_info.get("file_path")
     if not isinstance(file_path, str) or not os.path.isfile(file_path):
         raise ValueError("original file not found")
-    vision_service = VisionService()
+    vision_service = get_vision_service()
     safe_boxes, image_method, strength, fill_color = prepare_image_redaction(bounding_boxes, config)
     image_bytes = await vision_service.preview_redaction(
         file_path=file_path,
@@ -283,15 +291,14 @@ async def get_comparison(file_id: str) -> CompareData:
     """Get redaction before/after comparison. Raises ValueError on errors."""
     file_store = _get_file_store()
 
-    if file_id not in file_store:
+    file_info = file_store.get(file_id)
+    if file_info is None:
         raise ValueError("文件不存在")
 
-    file_info = file_store[file_id]
-
     if "output_path" not in file_info:
         raise ValueError("文件尚未匿名化")
 
-    redactor = Redactor()
+    redactor = get_redactor()
     compare_data = await redactor.get_comparison(file_info)
 
     return CompareData(
@@ -306,10 +313,11 @@ def get_versions(file_id: str) -> dict[str, Any]:
     """Get redaction version history. Raises ValueError if file not found."""
     file_store = _get_file_store()
 
-    if file_id not in file_store:
+    file_info = file_store.get(file_id)
+    if file_info is None:
         raise ValueError("文件不存在")
 
-    history = file_store[file_id].get("redaction_history", [])
+    history = file_info.get("redaction_history", [])
     return {"file_id": file_id, "versions": history, "total": len(history)}
 
 
@@ -317,6 +325,14 @@ def get_versions(file_id: str) -> dict[str, Any]:
 # Vision detection
 # ---------------------------------------------------------------------------
 
+# 同一页、同一组参数的并发视觉识别共享一次管线执行（key → 正在运行的 Task）
+_inflight_vision: dict[tuple, asyncio.Task[VisionResult]] = {}
+
+
+def _ids_key(ids: list[str] | None) -> tuple[str, ...] | None:
+    return None if ids is None else tuple(ids)
+
+
 async def detect_vision(
     file_id: str,
     page: int = 1,
@@ -334,7 +350,68 @@ async def detect_vision(
     """
     Run dual-pipeline vision detection. Raises ValueError if file not found.
     `has_request` indicates whether a request body was provided (affects defaults).
+
+    前端并行请求多页时常会对同一页重复发起识别；参数完全相同的并发请求
+    合并为一次执行（force 请求除外），后到者等待同一结果。
     """
+    kwargs = dict(
+        file_id=file_id,
+        page=page,
+        selected_ocr_has_types=selected_ocr_has_types,
+        selected_has_image_types=selected_has_image_types,
+        selected_vlm_types=selected_vlm_types,
+        has_request=has_request,
+        force=force,
+        include_result_image=include_result_image,
+        merge_existing=merge_existing,
+        signature_selected_ocr_has_types=signature_selected_ocr_has_types,
+        signature_selected_has_image_types=signature_selected_has_image_types,
+        signature_selected_vlm_types=signature_selected_vlm_types,
+    )
+    if force:
+        return await _detect_vision(**kwargs)
+
+    key = (
+        file_id,
+        page,
+        _ids_key(selected_ocr_has_types),
+        _ids_key(selected_has_image_types),
+        _ids_key(selected_vlm_types),
+        has_request,
+        include_result_image,
+        merge_existing,
+        _ids_key(signature_selected_ocr_has_types),
+        _ids_key(signature_selected_has_image_types),
+        _ids_key(signature_selected_vlm_types),
+    )
+    task = _inflight_vision.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_detect_vision(**kwargs))
+        _inflight_vision[key] = task
+        task.add_done_callback(lambda _t: _inflight_vision.pop(key, None))
+        return await asyncio.shield(task)
+
+    result = await asyncio.shield(task)
+    logger.info("Vision request coalesced file=%s page=%d", file_id[:8], page)
+    return result.model_copy(
+        update={"cache_status": {**result.cache_status, "vision_result": "coalesced"}}
+    )
+
+
+async def _detect_vision(
+    file_id: str,
+    page: int = 1,
+    selected_ocr_has_types: list[str] | None = None,
+    selected_has_image_types: list[str] | None = None,
+    selected_vlm_types: list[str] | None = None,
+    has_request: bool = True,
+    force: bool = False,
+    include_result_image: bool = True,
+    merge_existing: bool = False,
+    signature_selected_ocr_has_types: list[str] | None = None,
+    signature_selected_has_image_types: list[str] | None = None,
+    signature_selected_vlm_types: list[str] | None = None,
+) -> VisionResult:
     started = time.perf_counter()
     file_store = _get_file_store()
     lock = _get_file_store_lock()
@@ -346,12 +423,10 @@ async def detect_vision(
         snapshot = dict(file_info)
 
     # 获取两个 Pipeline 的类型配置
-    from app.services.pipeline_service import get_pipeline_types_for_mode, pipelines_db
+    from app.services.pipeline_service import get_pipeline_types_for_mode, pipelines_db, select_pipeline_types
 
     all_ocr_has_types = get_pipeline_types_for_mode("ocr_has")
     default_has_image_types = _default_has_image_types(get_pipeline_types_for_mode("has_image"))
-    selectable_has_image_types = get_pipeline_types_for_mode("has_image", enabled_only=False)
-    selectable_vlm_types = get_pipeline_types_for_mode("vlm", enabled_only=False)
 
     sel_ocr_ids: set[str] | None = None
     sel_img_ids: set[str] | None = None
@@ -369,17 +444,17 @@ async def detect_vision(
             sel_vlm_ids = set(selected_vlm_types or [])
 
     if sel_ocr_ids is not None:
-        ocr_has_types = [t for t in all_ocr_has_types if t.id in sel_ocr_ids]
+        ocr_has_types = select_pipeline_types("ocr_has", sel_ocr_ids)
     else:
         ocr_has_types = all_ocr_has_types
 
     if sel_img_ids is not None:
-        has_image_types = [t for t in selectable_has_image_types if t.id in sel_img_ids]
+        has_image_types = select_pipeline_types("has_image", sel_img_ids, enabled_only=False)
     else:
         has_image_types = default_has_image_types
 
     if sel_vlm_ids is not None:
-        vlm_types = [t for t in selectable_vlm_types if t.id in sel_vlm_ids]
+        vlm_types = select_pipeline_types("vlm", sel_vlm_ids, enabled_only=False)
     else:
         vlm_types = []
 
@@ -429,9 +504,10 @@ async def detect_vision(
             "若希望识别文字，请在侧栏勾选至少一类 OCR+HaS 类型，或清除 localStorage 键 ocrHasTypes 后刷新。"
         )
 
-    logger.info("OCR+HaS selected: %s", [t.id for t in ocr_has_types] if ocr_has_types else [])
-    logger.info("HaS Image selected: %s", [t.id for t in has_image_types] if has_image_types else [])
-    logger.info("VLM selected: %s", [t.id for t in vlm_types] if vlm_types else [])
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("OCR+HaS selected: %s", [t.id for t in ocr_has_types])
+        logger.debug("HaS Image selected: %s", [t.id for t in has_image_types])
+        logger.debug("VLM selected: %s", [t.id for t in vlm_types])
 
     effective_ocr_types = ocr_has_types if ocr_has_enabled else None
     effective_has_image_types = has_image_types if has_image_enabled else None
@@ -442,13 +518,15 @@ async def detect_vision(
     signature_vlm_types = effective_vlm_types
     if signature_selected_ocr_has_types is not None:
         sig_ocr_ids = set(signature_selected_ocr_has_types or [])
-        signature_ocr_types = [t for t in all_ocr_has_types if t.id in sig_ocr_ids] if sig_ocr_ids else None
+        signature_ocr_types = select_pipeline_types("ocr_has", sig_ocr_ids) if sig_ocr_ids else None
     if signature_selected_has_image_types is not None:
         sig_img_ids = set(signature_selected_has_image_types or [])
-        signature_has_image_types = [t for t in selectable_has_image_types if t.id in sig_img_ids] if sig_img_ids else None
+        signature_has_image_types = (
+            select_pipeline_types("has_image", sig_img_ids, enabled_only=False) if sig_img_ids else None
+        )
     if signature_selected_vlm_types is not None:
         sig_vlm_ids = set(signature_selected_vlm_types or [])
-        signature_vlm_types = [t for t in selectable_vlm_types if t.id in sig_vlm_ids] if sig_vlm_ids else None
+        signature_vlm_types = select_pipeline_types("vlm", sig_vlm_ids, enabled_only=False) if sig_vlm_ids else None
 
     signature = _vision_signature(page, signature_ocr_types, signature_has_image_types, signature_vlm_types)
     if not force:
@@ -465,24 +543,32 @@ async def detect_vision(
     else:
         logger.info("Vision force refresh file=%s page=%d", file_id[:8], page)
 
-    vision_service = VisionService()
-    bounding_boxes, result_image = await vision_service.detect_with_dual_pipeline(
-        file_path=snapshot["file_path"],
-        file_type=snapshot["file_type"],
-        page=page,
-        ocr_has_types=effective_ocr_types,
-        has_image_types=effective_has_image_types,
-        vlm_types=effective_vlm_types,
-        include_result_image=include_result_image,
-    )
-    warnings = list(getattr(vision_service, "last_warnings", []) or [])
-    pipeline_status = dict(getattr(vision_service, "last_pipeline_status", {}) or {})
-    duration_ms = dict(getattr(vision_service, "last_duration_ms", {}) or {})
+    if ocr_has_enabled or has_image_enabled or vlm_enabled:
+        vision_service = VisionService()
+        bounding_boxes, result_image = await vision_service.detect_with_dual_pipeline(
+            file_path=snapshot["file_path"],
+            file_type=snapshot["file_type"],
+            page=page,
+            ocr_has_types=effective_ocr_types,
+            has_image_types=effective_has_image_types,
+            vlm_types=effective_vlm_types,
+            include_result_image=include_result_image,
+        )
+        warnings = list(getattr(vision_service, "last_warnings", []) or [])
+        pipeline_status = dict(getattr(vision_service, "last_pipeline_status", {}) or {})
+        duration_ms = dict(getattr(vision_service, "last_duration_ms", {}) or {})
+    else:
+        # 没有任何管线需要运行：不读取/渲染页面，直接返回空结果
+        logger.info("No vision pipeline enabled file=%s page=%d; skipping page render", file_id[:8], page)
+        bounding_boxes, result_image = [], None
+        warnings = []
+        pipeline_status = _initial_pipeline_status()
+        duration_ms = {}
     if merge_existing:
         existing_boxes = _boxes_from_page(_page_value(snapshot.get("bounding_boxes"), page), page)
         if existing_boxes:
             merged_boxes = [*existing_boxes, *bounding_boxes]
-            bounding_boxes = VisionService()._deduplicate_boxes(merged_boxes)
+            bounding_boxes = get_vision_service()._deduplicate_boxes(merged_boxes)
         existing_quality = _page_value(snapshot.get("vision_quality"), page) or {}
         if isinstance(existing_quality, dict):
             existing_status = dict(existing_quality.get("pipeline_status") or {})
@@ -518,18 +604,12 @@ async def detect_vision(
 
     # Write back under lock
     async with lock:
-        if file_id in file_store:
-            info = file_store.get(file_id)
-            if "bounding_boxes" not in info:
-                info["bounding_boxes"] = {}
-            info["bounding_boxes"][page] = bounding_boxes
-            if "vision_quality" not in info or not isinstance(info.get("vision_quality"), dict):
-                info["vision_quality"] = {}
-            info["vision_quality"][page] = vision_quality
-            if "vision_detection_signature" not in info or not isinstance(info.get("vision_detection_signature"), dict):
-                info["vision_detection_signature"] = {}
-            info["vision_detection_signature"][page] = signature
-            file_store.set(file_id, info)
+        info = file_store.get(file_id)
+        if info is not None:
+            info.setdefault("bounding_boxes", {})[page] = bounding_boxes
+            _page_map(info, "vision_quality")[page] = vision_quality
+            _page_map(info, "vision_detection_signature")[page] = signature
+            await asyncio.to_thread(file_store.set, file_id, info)
 
     logger.info(
         "Vision detect stored file=%s page=%d boxes=%d elapsed=%.2fs",
@@ -558,10 +638,9 @@ def get_report(file_id: str) -> RedactionReport:
     """Generate redaction quality report. Raises ValueError if file not found."""
     file_store = _get_file_store()
 
-    if file_id not in file_store:
+    file_info = file_store.get(file_id)
+    if file_info is None:
         raise ValueError("文件不存在")
-
-    file_info = file_store[file_id]
     entities = file_info.get("entities", [])
 
     # Count by type
@@ -640,43 +719,48 @@ def get_report(file_id: str) -> RedactionReport:
 # Entity types / replacement modes reference data
 # ---------------------------------------------------------------------------
 
+_ENTITY_TYPES_LIST: list[dict[str, Any]] = [
+    {"value": EntityType.PERSON.value, "label": "人名", "color": "#F59E0B"},
+    {"value": EntityType.ORG.value, "label": "机构/公司", "color": "#3B82F6"},
+    {"value": EntityType.ID_CARD.value, "label": "身份证号", "color": "#EF4444"},
+    {"value": EntityType.PHONE.value, "label": "电话号码", "color": "#10B981"},
+    {"value": EntityType.ADDRESS.value, "label": "地址", "color": "#8B5CF6"},
+    {"value": EntityType.BANK_CARD.value, "label": "银行卡号", "color": "#EC4899"},
+    {"value": EntityType.CASE_NUMBER.value, "label": "案件编号", "color": "#6366F1"},
+    {"value": EntityType.DATE.value, "label": "日期", "color": "#14B8A6"},
+    {"value": EntityType.AMOUNT.value, "label": "金额", "color": "#F97316"},
+    {"value": EntityType.CUSTOM.value, "label": "自定义", "color": "#6B7280"},
+]
+
+_REPLACEMENT_MODES_LIST: list[dict[str, Any]] = [
+    {
+        "value": ReplacementMode.SMART.value,
+        "label": "智能替换",
+        "description": "将敏感信息替换为语义化的标识，如 '当事人甲'、'公司A'",
+    },
+    {
+        "value": ReplacementMode.STRUCTURED.value,
+        "label": "结构化语义标签",
+        "description": "用结构化标签替换敏感信息，保留层级语义与指代关系",
+    },
+    {
+        "value": ReplacementMode.MASK.value,
+        "label": "掩码替换",
+        "description": "将敏感信息替换为 *** 或部分隐藏，如 '张**'、'138****1234'",
+    },
+    {
+        "value": ReplacementMode.CUSTOM.value,
+        "label": "自定义替换",
+        "description": "手动指定每个敏感信息的替换文本",
+    },
+]
+
+
 def get_entity_types_list() -> list[dict[str, Any]]:
-    """Return the built-in entity type reference list."""
-    return [
-        {"value": EntityType.PERSON.value, "label": "人名", "color": "#F59E0B"},
-        {"value": EntityType.ORG.value, "label": "机构/公司", "color": "#3B82F6"},
-        {"value": EntityType.ID_CARD.value, "label": "身份证号", "color": "#EF4444"},
-        {"value": EntityType.PHONE.value, "label": "电话号码", "color": "#10B981"},
-        {"value": EntityType.ADDRESS.value, "label": "地址", "color": "#8B5CF6"},
-        {"value": EntityType.BANK_CARD.value, "label": "银行卡号", "color": "#EC4899"},
-        {"value": EntityType.CASE_NUMBER.value, "label": "案件编号", "color": "#6366F1"},
-        {"value": EntityType.DATE.value, "label": "日期", "color": "#14B8A6"},
-        {"value": EntityType.AMOUNT.value, "label": "金额", "color": "#F97316"},
-        {"value": EntityType.CUSTOM.value, "label": "自定义", "color": "#6B7280"},
-    ]
+    """Return the built-in entity type reference list (shared constant; do not mutate)."""
+    return _ENTITY_TYPES_LIST
 
 
 def get_replacement_modes_list() -> list[dict[str, Any]]:
-    """Return the built-in replacement mode reference list."""
-    return [
-        {
-            "value": ReplacementMode.SMART.value,
-            "label": "智能替换",
-            "description": "将敏感信息替换为语义化的标识，如 '当事人甲'、'公司A'",
-        },
-        {
-            "value": ReplacementMode.STRUCTURED.value,
-            "label": "结构化语义标签",
-            "description": "用结构化标签替换敏感信息，保留层级语义与指代关系",
-        },
-        {
-            "value": ReplacementMode.MASK.value,
-            "label": "掩码替换",
-            "description": "将敏感信息替换为 *** 或部分隐藏，如 '张**'、'138****1234'",
-        },
-        {
-            "value": ReplacementMode.CUSTOM.value,
-            "label": "自定义替换",
-            "description": "手动指定每个敏感信息的替换文本",
-        },
-    ]
+    """Return the built-in replacement mode reference list (shared constant; do not mutate)."""
+    return _REPLACEMENT_MODES_LIST
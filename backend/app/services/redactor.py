@@ -25,7 +25,7 @@ from app.services.redaction.replacement_strategy import (  # noqa: F401
     build_preview_entity_map,
 )
 from app.services.redaction.text_redactor import TextRedactorMixin
-from app.services.vision_service import VisionService
+from app.services.vision_service import get_vision_service
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +34,7 @@ class Redactor(TextRedactorMixin, ImageRedactorMixin):
     """匿名化执行器（编排入口）"""
 
     def __init__(self):
-        self.vision_service = VisionService()
+        self.vision_service = get_vision_service()
 
     def _resolve_existing_path(self, raw_path: Any, preferred_dir: str) -> str | None:
         """Resolve legacy relative storage paths against the configured storage directory."""
@@ -267,3 +267,14 @@ class Redactor(TextRedactorMixin, ImageRedactorMixin):
                 })
 
         return changes
+
+
+# 单例：Redactor 不持有逐请求状态，所有调用方共享同一实例
+_redactor: Redactor | None = None
+
+
+def get_redactor() -> Redactor:
+    global _redactor
+    if _redactor is None:
+        _redactor = Redactor()
+    return _redactor
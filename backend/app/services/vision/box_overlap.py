@@ -0,0 +1,67 @@
+"""Vectorized box-overlap checks used by the dual-pipeline dedupe."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.models.schemas import BoundingBox
+
+
+class BoxOverlapIndex:
+    """已收录框的几何表：候选框与全部已收录框一次 numpy 向量化求 IoU / 小框覆盖率。
+
+    每行存 (x1, y1, x2, y2, area)，与 VisionService._calculate_iou /
+    _calculate_smaller_overlap 的浮点运算顺序一致，判定结果逐位相同。
+    ``key`` 为可选的整数分组（如语义目标族），只与同组框比较。
+    """
+
+    __slots__ = ("_geom", "_keys", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        self._geom = np.empty((max(capacity, 1), 5), dtype=np.float64)
+        self._keys = np.empty(max(capacity, 1), dtype=np.int64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, box: BoundingBox, key: int = 0) -> None:
+        if self._size == len(self._keys):
+            self._geom = np.concatenate([self._geom, np.empty_like(self._geom)])
+            self._keys = np.concatenate([self._keys, np.empty_like(self._keys)])
+        i = self._size
+        self._geom[i] = (box.x, box.y, box.x + box.width, box.y + box.height, box.width * box.height)
+        self._keys[i] = key
+        self._size = i + 1
+
+    def hits(
+        self,
+        box: BoundingBox,
+        *,
+        iou_threshold: float,
+        smaller_threshold: float,
+        key: int | None = None,
+    ) -> np.ndarray:
+        """返回布尔掩码（按 add 顺序）：IoU > iou_threshold 或小框覆盖率 >= smaller_threshold。"""
+        n = self._size
+        if n == 0:
+            return np.zeros(0, dtype=bool)
+        g = self._geom[:n]
+        area = box.width * box.height
+        iw = np.minimum(g[:, 2], box.x + box.width) - np.maximum(g[:, 0], box.x)
+        ih = np.minimum(g[:, 3], box.y + box.height) - np.maximum(g[:, 1], box.y)
+        valid = (iw > 0) & (ih > 0)
+        inter = iw * ih
+
+        union = area + g[:, 4] - inter
+        iou = np.divide(inter, union, out=np.zeros(n), where=valid & (union > 0))
+        smaller = np.minimum(area, g[:, 4])
+        covered = np.divide(inter, smaller, out=np.zeros(n), where=valid & (smaller > 0))
+
+        mask = (iou > iou_threshold) | (covered >= smaller_threshold)
+        if key is not None:
+            mask &= self._keys[:n] == key
+        return mask
+
+    def overlaps_any(self, box: BoundingBox, **kwargs) -> bool:
+        return bool(self.hits(box, **kwargs).any())
@@ -15,6 +15,7 @@ from collections import OrderedDict
 from threading import Lock
 
 import httpx
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,7 @@ from app.core.has_image_client import detect_privacy_regions
 from app.models.schemas import BoundingBox, FileType
 from app.services.file_parser import FileParser
 from app.services.hybrid_vision_service import get_hybrid_vision_service
+from app.services.vision.box_overlap import BoxOverlapIndex
 from app.services.vision.ocr_artifact_filter import (
     is_page_edge_ocr_artifact,
     region_has_visible_ink,
@@ -64,6 +66,25 @@ def _normalize_file_type(file_type: FileType | str) -> FileType | str:
         return file_type
 
 
+def _initial_pipeline_status(
+    ocr_has_types: list | None = None,
+    has_image_types: list | None = None,
+    vlm_types: list | None = None,
+) -> dict[str, dict]:
+    """各管线的初始状态；未选类型的管线标记为 skipped。"""
+    return {
+        label: {
+            "ran": False,
+            "skipped": not bool(types),
+            "failed": False,
+            "region_count": 0,
+            "error": None,
+            "duration_ms": 0,
+        }
+        for label, types in (("ocr_has", ocr_has_types), ("has_image", has_image_types), ("vlm", vlm_types))
+    }
+
+
 def _pdf_text_layer_sparse_key(file_path: str) -> tuple[str, int, int] | None:
     try:
         resolved = os.path.realpath(file_path)
@@ -381,32 +402,7 @@ class VisionService:
                 raise
 
         all_boxes: list[BoundingBox] = []
-        pipeline_status: dict[str, dict] = {
-            "ocr_has": {
-                "ran": False,
-                "skipped": not bool(ocr_has_types),
-                "failed": False,
-                "region_count": 0,
-                "error": None,
-                "duration_ms": 0,
-            },
-            "has_image": {
-                "ran": False,
-                "skipped": not bool(has_image_types),
-                "failed": False,
-                "region_count": 0,
-                "error": None,
-                "duration_ms": 0,
-            },
-            "vlm": {
-                "ran": False,
-                "skipped": not bool(vlm_types),
-                "failed": False,
-                "region_count": 0,
-                "error": None,
-                "duration_ms": 0,
-            },
-        }
+        pipeline_status = _initial_pipeline_status(ocr_has_types, has_image_types, vlm_types)
         self.last_pipeline_status = pipeline_status
         self.last_duration_ms = duration_ms
         self.last_warnings: list[str] = []
@@ -514,24 +510,12 @@ class VisionService:
         if not jobs:
             logger.info("No vision pipeline jobs enabled; returning empty results")
         elif settings.VISION_DUAL_PIPELINE_PARALLEL and len(jobs) > 1:
-            if any(label == "vlm" for label, _factory in jobs):
-                logger.info("Dual pipeline scheduling: parallel non-VLM, VLM sequential")
-                non_vlm_jobs = [(label, factory) for label, factory in jobs if label != "vlm"]
-                vlm_jobs = [(label, factory) for label, factory in jobs if label == "vlm"]
-                labels = [label for label, _factory in non_vlm_jobs]
-                tasks = [asyncio.create_task(factory()) for _label, factory in non_vlm_jobs]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                for label, factory in vlm_jobs:
-                    labels.append(label)
-                    try:
-                        results.append(await factory())
-                    except Exception as exc:
-                        results.append(exc)
-            else:
-                logger.info("Dual pipeline scheduling: parallel")
-                labels = [label for label, _factory in jobs]
-                tasks = [asyncio.create_task(factory()) for _label, factory in jobs]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+            # VLM 也并发执行：耗时取各管线最大值而非相加；
+            # VLM 的 GPU 并发由 vlm_vision_service 的全局信号量 (VLM_CONCURRENCY) 限制
+            logger.info("Dual pipeline scheduling: parallel")
+            labels = [label for label, _factory in jobs]
+            tasks = [asyncio.create_task(factory()) for _label, factory in jobs]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
         else:
             logger.info("Dual pipeline scheduling: sequential")
             for label, factory in jobs:
@@ -645,7 +629,7 @@ class VisionService:
         boxes: list[BoundingBox],
         iou_threshold: float = 0.3,
     ) -> list[BoundingBox]:
-        """Deduplicate boxes efficiently after sorting by x position."""
+        """Deduplicate boxes; overlap checks run vectorized via BoxOverlapIndex."""
         if len(boxes) <= 1:
             return boxes
 
@@ -679,19 +663,20 @@ class VisionService:
         suppressed_ocr_ids: set[str] = set()
         enhanced_signatures: dict[str, BoundingBox] = {}
 
+        name_like_ocr = [b for b in ocr_boxes if _is_ocr_name_like(b)] if signature_boxes else []
+        name_index = BoxOverlapIndex(len(name_like_ocr))
+        for ocr in name_like_ocr:
+            name_index.add(ocr)
+
         for sig in signature_boxes:
             evidence: list[str] = []
-            for ocr in ocr_boxes:
-                if not _is_ocr_name_like(ocr):
-                    continue
-                if (
-                    self._calculate_iou(sig, ocr) > 0.05
-                    or self._calculate_smaller_overlap(sig, ocr) >= 0.35
-                ):
-                    suppressed_ocr_ids.add(ocr.id)
-                    text = _compact_text(ocr.text)
-                    if text and text not in evidence:
-                        evidence.append(text)
+            hit_mask = name_index.hits(sig, iou_threshold=0.05, smaller_threshold=0.35)
+            for idx in np.flatnonzero(hit_mask):
+                ocr = name_like_ocr[idx]
+                suppressed_ocr_ids.add(ocr.id)
+                text = _compact_text(ocr.text)
+                if text and text not in evidence:
+                    evidence.append(text)
             if evidence:
                 base_text = _compact_text(sig.text)
                 merged_text = base_text if base_text and base_text != _compact_text(sig.type) else "签字"
@@ -748,48 +733,45 @@ class VisionService:
             box_type = _norm_type(box.type)
             return target_families.get(box_type, box_type)
 
-        def _same_semantic_target(a: BoundingBox, b: BoundingBox) -> bool:
-            """Only spatially dedupe boxes that describe the same target family.
-
-            OCR text spans, object detector regions, and VLM semantic regions can
-            validly overlap on document pages. Spatial overlap alone is therefore
-            not enough evidence for dedupe; the semantic target family must also
-            match.
-            """
-            return _target_family(a) == _target_family(b)
-
-        def _overlaps_any(
-            candidate: BoundingBox,
-            existing: list[BoundingBox],
-            *,
-            require_same_visual_target: bool = False,
-        ) -> bool:
-            """Return whether candidate overlaps any existing box above threshold."""
-            cx_end = candidate.x + candidate.width
-            for eb in existing:
-                # Skip boxes that cannot overlap on the x axis.
-                if eb.x > cx_end or eb.x + eb.width < candidate.x:
-                    continue
-                if require_same_visual_target and not _same_semantic_target(candidate, eb):
-                    continue
-                if (
-                    self._calculate_iou(candidate, eb) > iou_threshold
-                    or self._calculate_smaller_overlap(candidate, eb) >= 0.72
-                ):
-                    return True
-            return False
+        # Only spatially dedupe boxes that describe the same target family.
+        # OCR text spans, object detector regions, and VLM semantic regions can
+        # validly overlap on document pages. Spatial overlap alone is therefore
+        # not enough evidence for dedupe; the semantic target family must also
+        # match. 目标族映射为整数 key，交给 BoxOverlapIndex 向量化过滤。
+        family_keys: dict[str, int] = {}
+
+        def _family_key(box: BoundingBox) -> int:
+            return family_keys.setdefault(_target_family(box), len(family_keys))
+
+        def _overlaps_any(candidate: BoundingBox, existing: BoxOverlapIndex) -> bool:
+            """Return whether candidate overlaps any same-family existing box above threshold."""
+            return existing.overlaps_any(
+                candidate,
+                iou_threshold=iou_threshold,
+                smaller_threshold=0.72,
+                key=_family_key(candidate),
+            )
+
+        index = BoxOverlapIndex(len(result) + len(hi_boxes) + len(other_boxes))
+        for ocr in result:
+            index.add(ocr, _family_key(ocr))
 
-        # 鎸?x 鎺掑簭鍔犻€熷壀鏋?        hi_boxes.sort(key=lambda b: b.x)
+        # HaS Image 框只与 OCR 框比较：先全部判定，再统一收录进索引
+        kept_hi = []
         for hi_box in hi_boxes:
-            if _overlaps_any(hi_box, ocr_boxes, require_same_visual_target=True):
+            if _overlaps_any(hi_box, index):
                 logger.debug("DEDUP HaS-Image '%s' overlaps same visual OCR box, skipping", hi_box.type)
             else:
-                result.append(hi_box)
+                kept_hi.append(hi_box)
+        for hi_box in kept_hi:
+            index.add(hi_box, _family_key(hi_box))
+        result.extend(kept_hi)
 
         other_boxes.sort(key=lambda b: b.x)
         for other_box in other_boxes:
-            if not _overlaps_any(other_box, result, require_same_visual_target=True):
+            if not _overlaps_any(other_box, index):
                 result.append(other_box)
+                index.add(other_box, _family_key(other_box))
 
         removed_count = len(boxes) - len(result)
         if removed_count > 0:
@@ -1529,3 +1511,18 @@ class VisionService:
         output.seek(0)
 
         return output.getvalue()
+
+
+# 共享实例
+_shared_vision_service: VisionService | None = None
+
+
+def get_vision_service() -> VisionService:
+    """共享实例，仅供无状态方法使用（apply/preview_redaction、_deduplicate_boxes）。
+
+    detect_* 会在实例上写 last_* 诊断字段，检测路径仍需每次新建 VisionService()。
+    """
+    global _shared_vision_service
+    if _shared_vision_service is None:
+        _shared_vision_service = VisionService()
+    return _shared_vision_service
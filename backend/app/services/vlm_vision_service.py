@@ -15,6 +15,7 @@ import numpy as np
 from PIL import Image, ImageOps
 
 from app.core.config import settings
+from app.core.retry import RETRYABLE_HTTPX, is_transient_http_error, retry_async
 from app.models.schemas import BoundingBox
 from app.services import model_config_service
 
@@ -38,6 +39,12 @@ class _DetectionView:
     original_height: int
 
 
+async def _post_checked(client: httpx.AsyncClient, url: str, headers: dict, payload: dict) -> httpx.Response:
+    response = await client.post(url, headers=headers, json=payload)
+    response.raise_for_status()
+    return response
+
+
 def _json_endpoint(base_url: str, suffix: str) -> str:
     base = (base_url or "").rstrip("/")
     if base.endswith("/v1"):
@@ -364,8 +371,19 @@ class VlmVisionService:
                             },
                         ],
                     }
-                    response = await client.post(url, headers=headers, json=payload)
-                    response.raise_for_status()
+                    response = await retry_async(
+                        _post_checked,
+                        client,
+                        url,
+                        headers,
+                        payload,
+                        max_retries=2,
+                        base_delay=0.5,
+                        max_delay=8.0,
+                        retryable_exceptions=(*RETRYABLE_HTTPX, httpx.HTTPStatusError),
+                        retry_if=is_transient_http_error,
+                        jitter=True,
+                    )
                     data = response.json()
                     content = str(data.get("choices", [{}])[0].get("message", {}).get("content", ""))
                     raw_responses.append(f"[{view.name}] {content}")
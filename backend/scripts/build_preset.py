@@ -0,0 +1,30 @@
+"""Build the pickled preset entity-type artifact.
+
+Validates config/preset_entity_types.json once and writes
+config/preset_entity_types.pkl next to it, so workers can skip pydantic
+validation of the preset list at import time. The artifact is keyed on the
+source JSON, the EntityTypeConfig schema and the pydantic version; a stale
+artifact is ignored automatically.
+
+Only app.services.entity_type_config is imported, so building the artifact
+does not touch the runtime data directory.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.entity_type_config import _PRESET_PICKLE_PATH, build_preset_artifact  # noqa: E402
+
+
+def main() -> int:
+    count = build_preset_artifact()
+    print(f"Wrote {count} preset entity types to {os.path.normpath(_PRESET_PICKLE_PATH)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from app.services import entity_type_config
+
+
+class PresetArtifactTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "preset.pkl")
+        with open(entity_type_config._PRESET_JSON_PATH, "rb") as f:
+            self.raw = f.read()
+
+    def test_artifact_loads_with_matching_key(self):
+        count = entity_type_config.build_preset_artifact(self.path)
+        presets = entity_type_config._load_preset_pickle(
+            entity_type_config._preset_cache_key(self.raw), self.path
+        )
+        self.assertIsNotNone(presets)
+        self.assertEqual(len(presets), count)
+
+    def test_pydantic_upgrade_invalidates_artifact(self):
+        entity_type_config.build_preset_artifact(self.path)
+        with mock.patch.object(entity_type_config.pydantic, "VERSION", "0.0.0"):
+            key = entity_type_config._preset_cache_key(self.raw)
+        self.assertIsNone(entity_type_config._load_preset_pickle(key, self.path))
+
+    def test_schema_change_invalidates_artifact(self):
+        entity_type_config.build_preset_artifact(self.path)
+        schema = entity_type_config.EntityTypeConfig.model_json_schema()
+        schema["properties"]["new_field"] = {"type": "string"}
+        with mock.patch.object(
+            entity_type_config.EntityTypeConfig, "model_json_schema", return_value=schema
+        ):
+            key = entity_type_config._preset_cache_key(self.raw)
+        self.assertIsNone(entity_type_config._load_preset_pickle(key, self.path))
+
+    def test_import_has_no_persistence_side_effects(self):
+        # 构建脚本只导入本模块，镜像构建时不能顺带加载持久化服务
+        code = (
+            "import sys, app.services.entity_type_config; "
+            "print('app.services.entity_type_service' in sys.modules)"
+        )
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=backend_dir, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(out.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from app.core.config import settings
+from app.services import entity_type_service as ets
+from app.services.entity_type_service import CreateEntityTypeRequest, UpdateEntityTypeRequest
+
+
+class EntityTypeWriteTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        # 还原内存库后重建派生索引，避免影响其他用例
+        self.addCleanup(ets._invalidate_caches)
+        for patcher in (
+            mock.patch.object(settings, "ENTITY_TYPES_STORE_PATH", os.path.join(tmp.name, "entity_types.json")),
+            mock.patch.object(ets, "entity_types_db", ets.entity_types_db),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.custom = ets.create_type(
+            CreateEntityTypeRequest(name="合同编号", data_domain="document_record", generic_target="GEN_NUMBER_CODE")
+        )
+
+    def test_concurrent_toggle_is_not_lost_by_update(self):
+        normalize = ets.normalize_text_taxonomy
+        toggler = threading.Thread(target=ets.toggle_type, args=(self.custom.id,))
+
+        def normalize_while_toggling(*args, **kwargs):
+            # update_type 合并期间并发 toggle：必须等 update 提交后才能执行
+            toggler.start()
+            toggler.join(timeout=0.2)
+            return normalize(*args, **kwargs)
+
+        with mock.patch.object(ets, "normalize_text_taxonomy", normalize_while_toggling):
+            updated = ets.update_type(self.custom.id, UpdateEntityTypeRequest(name="合同号"))
+        toggler.join()
+
+        self.assertEqual(updated.name, "合同号")
+        current = ets.entity_types_db[self.custom.id]
+        self.assertEqual(current.name, "合同号")
+        self.assertFalse(current.enabled)
+
+    def test_update_of_deleted_type_returns_none(self):
+        ets.delete_type(self.custom.id)
+        self.assertIsNone(ets.update_type(self.custom.id, UpdateEntityTypeRequest(name="x")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.exceptions import RequestValidationError
+from fastapi.testclient import TestClient
+
+from app.api import entity_types
+from app.core.errors import validation_exception_handler
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(entity_types.router, prefix="/api")
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class EntityTypesApiTests(unittest.TestCase):
+    def test_malformed_or_empty_body_returns_422(self):
+        client = _client()
+        headers = {"content-type": "application/json"}
+        post, put = ("POST", "/api/custom-types"), ("PUT", "/api/custom-types/custom_x")
+        cases = [
+            (post, b"{", "json_invalid"),
+            (put, b"{", "json_invalid"),
+            (post, b"", "missing"),
+            (put, b"", "missing"),
+            (post, b'{"name": 1}', "string_type"),
+            # model_validator 抛出的 ValueError 会带在 ctx 里，同样要能序列化
+            (post, b'{"name": "x", "generic_target": ""}', "value_error"),
+        ]
+        for (method, url), body, error_type in cases:
+            with self.subTest(method=method, body=body):
+                response = client.request(method, url, content=body, headers=headers)
+                self.assertEqual(response.status_code, 422)
+                errors = response.json()["detail"]["errors"]
+                self.assertEqual(errors[0]["loc"][0], "body")
+                self.assertIn(error_type, {err["type"] for err in errors})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+import random
+import re
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from app.core.config import settings
+from app.services.entity_type_config import EntityTypeConfig, compile_entity_pattern
+from app.services.entity_types_compiler import EntityTypeScanner, extract_required_literal, scan
+
+_HS_UCP = 1 << 4
+
+# (正则片段, 一个能被该片段匹配的样本)，用于随机拼装模式与必然命中的文本
+_PATTERN_PIECES = [
+    ("ab", "ab"),
+    ("编号", "编号"),
+    ("12", "12"),
+    ("Z", "z"),
+    (r"\x41", "A"),
+    (r"\x4142", "A42"),
+    (r"\u4e00", "一"),
+    (r"\u4e0012", "一12"),
+    (r"\U0001F600", "\U0001F600"),
+    (r"\101", "A"),
+    (r"\1014", "A4"),
+    (r"\012", "\n"),
+    (r"\N{DIGIT ONE}", "1"),
+    (r"\N{DIGIT ONE}23", "123"),
+    (r"\d", "７"),
+    (r"\w", "é"),
+    (r"\.", "."),
+    ("[0-9]", "5"),
+    ("(?:cd)?", ""),
+    ("x?", ""),
+    ("y{0,2}", ""),
+    # 计数量词：量词体里的数字不是必需字面量，被量词修饰的字符/组可能不出现
+    (r"\d{12}", "903456789093"),
+    (r"\d{18}", "３" * 18),
+    ("[A-Z]{2,}", "QQ"),
+    ("a{2}", "aa"),
+    ("号{1,3}", "号号"),
+    ("cd{0,1}", "c"),
+    ("ef*", "e"),
+    ("(?:gh){0,2}", ""),
+    ("(?:ij){3}", "ijijij"),
+    ("k{,2}", ""),
+]
+
+
+class _FakeHyperscanDatabase:
+    r"""按 hyperscan 语义模拟：未带 UCP 时 \d / \w / \s 只匹配 ASCII。"""
+
+    def __init__(self, mode=None):
+        self._compiled = []
+
+    def compile(self, expressions, ids, flags):
+        self._compiled = [
+            (pattern_id, re.compile(expr.decode("utf-8"), re.IGNORECASE | (0 if flag & _HS_UCP else re.ASCII)))
+            for expr, pattern_id, flag in zip(expressions, ids, flags, strict=True)
+        ]
+
+    def scan(self, data, match_event_handler):
+        text = data.decode("utf-8")
+        for pattern_id, compiled in self._compiled:
+            found = compiled.search(text)
+            if found:
+                match_event_handler(pattern_id, found.start(), found.end(), 0, None)
+
+
+def _fake_hyperscan():
+    return SimpleNamespace(
+        HS_FLAG_CASELESS=1,
+        HS_FLAG_UTF8=2,
+        HS_FLAG_SINGLEMATCH=8,
+        HS_FLAG_UCP=_HS_UCP,
+        HS_MODE_BLOCK=0,
+        Database=_FakeHyperscanDatabase,
+        dumpb=lambda db: b"",
+        loadb=lambda raw: None,
+    )
+
+
+class _FakeRe2Set:
+    r"""按 re2 语义模拟：\d / \w / \s 只匹配 ASCII。"""
+
+    def __init__(self, options):
+        self._patterns = []
+
+    @classmethod
+    def SearchSet(cls, options):  # noqa: N802 - 与 re2 API 同名
+        return cls(options)
+
+    def Add(self, pattern):  # noqa: N802
+        self._patterns.append(re.compile(pattern, re.IGNORECASE | re.ASCII))
+        return len(self._patterns) - 1
+
+    def Compile(self):  # noqa: N802
+        return True
+
+    def Match(self, text):  # noqa: N802
+        return [i for i, compiled in enumerate(self._patterns) if compiled.search(text)]
+
+
+def _fake_re2():
+    return SimpleNamespace(Options=SimpleNamespace, Set=_FakeRe2Set)
+
+
+class EntityTypesCompilerTests(unittest.TestCase):
+    def test_required_literal_ignores_optional_and_alternation(self):
+        self.assertEqual(extract_required_literal(r"身份证号[:：]?\d{18}"), "身份证号")
+        self.assertEqual(extract_required_literal(r"护照(号)?[A-Z]\d{8}"), "护照")
+        self.assertEqual(extract_required_literal(r"colou?r"), "colo")
+        self.assertIsNone(extract_required_literal(r"abc|def"))
+        self.assertIsNone(extract_required_literal(r"x+y"))
+
+    def test_required_literal_skips_whole_multichar_escapes(self):
+        self.assertEqual(extract_required_literal(r"\x41BC号码"), "bc号码")
+        self.assertEqual(extract_required_literal(r"ab\x4142"), "ab")
+        self.assertEqual(extract_required_literal(r"\u4e0012"), "12")
+        self.assertEqual(extract_required_literal(r"\U0001F600xy"), "xy")
+        self.assertEqual(extract_required_literal(r"\N{DIGIT ONE}23abc"), "23abc")
+        self.assertEqual(extract_required_literal(r"\101bc"), "bc")
+        self.assertIsNone(extract_required_literal(r"(a)\1234"))
+
+    def test_required_literal_skips_counted_quantifier_bodies(self):
+        self.assertIsNone(extract_required_literal(r"\d{12}"))
+        self.assertIsNone(extract_required_literal(r"\d{18}"))
+        self.assertEqual(extract_required_literal(r"账号\d{12,19}"), "账号")
+        self.assertEqual(extract_required_literal(r"(?:ab){0,2}cd"), "cd")
+        self.assertEqual(extract_required_literal(r"[A-Z]{2,}号码"), "号码")
+
+        scanner = EntityTypeScanner([
+            ("custom_x", compile_entity_pattern(r"\d{12}")),
+            ("custom_plate", compile_entity_pattern(r"AB\d{3}")),
+        ])
+        self.assertEqual(
+            scanner.scan("账号 987654321099 车牌 AB999"),
+            [("custom_x", 3, 15), ("custom_plate", 19, 24)],
+        )
+
+    def test_required_literal_never_filters_out_a_real_match(self):
+        rng = random.Random(20260416)
+        for _ in range(3000):
+            pieces = rng.choices(_PATTERN_PIECES, k=rng.randint(1, 6))
+            pattern = "".join(piece for piece, _ in pieces)
+            compiled = compile_entity_pattern(pattern)
+            text = "前缀 " + "".join(sample for _, sample in pieces) + " 后缀"
+            self.assertIsNotNone(compiled.search(text), pattern)
+            literal = extract_required_literal(pattern)
+            self.assertTrue(literal is None or literal in text.casefold(), (pattern, literal))
+
+    def test_scan_matches_per_type_finditer(self):
+        types = [
+            EntityTypeConfig(id="custom_passport", name="护照号", regex_pattern=r"护照号[:：]?[A-Z]\d{8}"),
+            EntityTypeConfig(id="custom_case", name="编号", regex_pattern=r"AB\d+"),
+        ]
+        text = "护照号：E12345678，编号 ab12 与 AB3"
+
+        self.assertEqual(
+            scan(text, types),
+            [("custom_passport", 0, 13), ("custom_case", 17, 21), ("custom_case", 24, 27)],
+        )
+        self.assertEqual(scan("没有任何敏感信息", types), [])
+        # 字面量都在、但没有完整命中：由交替式 search 一次性排除
+        self.assertEqual(scan("护照号待补充，编号 AB 未填", types), [])
+
+    def test_hyperscan_prefilter_keeps_unicode_digit_matches(self):
+        entries = [("custom_no", compile_entity_pattern(r"编号\d{3}"))]
+        with (
+            tempfile.TemporaryDirectory() as data_dir,
+            mock.patch.dict(sys.modules, {"hyperscan": _fake_hyperscan()}),
+            mock.patch.object(settings, "DATA_DIR", data_dir),
+        ):
+            scanner = EntityTypeScanner(entries)
+            self.assertIsNotNone(scanner._hs_db)
+            # 全角数字：Python re 的 \d 能匹配，预扫不能把它筛掉
+            self.assertEqual(scanner.scan("编号１２３"), [("custom_no", 0, 5)])
+            self.assertEqual(scanner.scan("编号123"), [("custom_no", 0, 5)])
+
+    def test_re2_prefilter_keeps_unicode_class_matches(self):
+        entries = [
+            ("custom_no", compile_entity_pattern(r"编号\d{3}")),
+            ("custom_case", compile_entity_pattern(r"案号[A-Z]+")),
+        ]
+        with mock.patch.dict(sys.modules, {"hyperscan": None, "re2": _fake_re2()}):
+            scanner = EntityTypeScanner(entries)
+        self.assertIsNotNone(scanner._re2_set)
+        # \d 在 re2 里只认 ASCII，这类模式不进 Set，始终走 Python 正则
+        self.assertEqual(scanner._re2_indexes, [1])
+        self.assertEqual(scanner.scan("编号１２３，案号AB"), [("custom_no", 0, 5), ("custom_case", 6, 10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
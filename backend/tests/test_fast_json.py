@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.core import fast_json
+from app.core.fast_json import FastJSONResponse
+
+_SAMPLE = {
+    "file_id": "abc",
+    "实体": [{"text": "张三", "start": 0, "end": 2, "score": 0.98}],
+    "counts": {1: 2},
+    "flags": [True, False, None],
+    "big": 2**70,
+}
+
+
+class _Entity(BaseModel):
+    text: str
+    start: int
+
+
+def _branches():
+    if fast_json.orjson is not None:
+        yield "orjson", mock.patch.object(fast_json, "orjson", fast_json.orjson)
+    yield "stdlib", mock.patch.object(fast_json, "orjson", None)
+
+
+class FastJSONResponseTests(unittest.TestCase):
+    def test_render_matches_starlette_json_response(self):
+        expected = JSONResponse(_SAMPLE).body
+        for name, patcher in _branches():
+            with self.subTest(branch=name), patcher:
+                self.assertEqual(FastJSONResponse(_SAMPLE).body, expected)
+
+    def test_default_response_class_serializes_route_results(self):
+        app = FastAPI(default_response_class=FastJSONResponse)
+
+        @app.get("/entity")
+        def entity() -> _Entity:
+            return _Entity(text="张三", start=0)
+
+        for name, patcher in _branches():
+            with self.subTest(branch=name), patcher:
+                resp = TestClient(app).get("/entity")
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(resp.headers["content-type"], "application/json")
+                self.assertEqual(resp.content, '{"text":"张三","start":0}'.encode())
+
+
+if __name__ == "__main__":
+    unittest.main()
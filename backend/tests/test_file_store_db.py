@@ -0,0 +1,77 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from app.services.file_store_db import FileStoreDB
+
+_RECORD = {
+    "id": "f1",
+    "original_filename": "合同.pdf",
+    "created_at": "2026-01-01T00:00:00",
+    "entity_count": 2,
+    "content": "甲方：张三，身份证号 110101199003071234",
+    "pages": ["第一页", "第二页"],
+}
+
+
+class FileStoreDBTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, "file_store.sqlite3")
+
+    def test_set_get_round_trip_keeps_content_and_pages(self):
+        FileStoreDB(self.db_path).set("f1", _RECORD)
+
+        # 新实例不带读缓存，数据来自磁盘上拆开存放的两列
+        store = FileStoreDB(self.db_path)
+        self.assertEqual(store.get("f1"), _RECORD)
+        self.assertEqual(store.items(), [("f1", _RECORD)])
+
+        store.update_fields("f1", {"entity_count": 3})
+        self.assertEqual(FileStoreDB(self.db_path).get("f1"), {**_RECORD, "entity_count": 3})
+
+    def test_metadata_items_exclude_payload_fields(self):
+        store = FileStoreDB(self.db_path)
+        store.set("f1", _RECORD)
+
+        [(file_id, meta)] = store.metadata_items()
+        self.assertEqual(file_id, "f1")
+        self.assertEqual(meta, {k: v for k, v in _RECORD.items() if k not in ("content", "pages")})
+        # 元数据缓存随写入失效
+        store.update_fields("f1", {"entity_count": 5})
+        self.assertEqual(store.metadata_items()[0][1]["entity_count"], 5)
+
+    def test_legacy_row_without_payload_column_reads_back_intact(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(
+            """
+            CREATE TABLE file_store (
+                file_id TEXT PRIMARY KEY,
+                data_json TEXT NOT NULL,
+                created_at TEXT,
+                updated_at TEXT
+            );
+            """
+        )
+        conn.execute(
+            "INSERT INTO file_store (file_id, data_json, created_at) VALUES (?, ?, ?)",
+            ("f1", json.dumps(_RECORD, ensure_ascii=False), _RECORD["created_at"]),
+        )
+        conn.commit()
+        conn.close()
+
+        store = FileStoreDB(self.db_path)
+        self.assertEqual(store.get("f1"), _RECORD)
+        self.assertEqual(store.values(), [_RECORD])
+
+        # 下次写入时拆分：正文移入 payload_json，元数据不再带正文
+        store.update_fields("f1", {"entity_count": 3})
+        self.assertEqual(FileStoreDB(self.db_path).get("f1"), {**_RECORD, "entity_count": 3})
+        self.assertNotIn("content", store.metadata_items()[0][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.services.file_management_service as _fms
+from app.api import files
+from app.core.config import settings
+
+
+class FileDownloadCachingTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "contract.txt")
+        with open(self.path, "wb") as f:
+            f.write("合同正文".encode())
+        snapshot = {"file_path": self.path, "original_filename": "contract.txt"}
+        for patcher in (
+            mock.patch.object(settings, "UPLOAD_DIR", tmp.name),
+            mock.patch.object(_fms, "get_file_snapshot", mock.AsyncMock(return_value=snapshot)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        app = FastAPI()
+        app.include_router(files.router, prefix="/api")
+        self.client = TestClient(app)
+        self.url = "/api/files/f1/download"
+
+    def test_download_sets_private_no_cache_and_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, "合同正文".encode())
+        self.assertEqual(response.headers["cache-control"], "private, no-cache")
+        self.assertTrue(response.headers.get("etag"))
+
+    def test_if_none_match_round_trip_returns_304(self):
+        etag = self.client.get(self.url).headers["etag"]
+        for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+            with self.subTest(if_none_match=header):
+                response = self.client.get(self.url, headers={"If-None-Match": header})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+                self.assertEqual(response.headers["etag"], etag)
+                self.assertEqual(response.headers["cache-control"], "private, no-cache")
+
+    def test_changed_file_invalidates_etag(self):
+        etag = self.client.get(self.url).headers["etag"]
+        with open(self.path, "ab") as f:
+            f.write(b" v2")
+
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["etag"], etag)
+        self.assertEqual(response.content, "合同正文 v2".encode())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.core.config import settings
+from app.models.schemas import ModelConfig
+from app.services import model_config_service
+
+
+class ModelConfigCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "model_config.json")
+        for patcher in (
+            mock.patch.object(settings, "MODEL_CONFIG_PATH", self.path),
+            mock.patch.object(model_config_service, "_parsed_cache", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        model_config_service.reset_configs()
+
+    def test_external_file_rewrite_is_picked_up(self):
+        self.assertEqual(model_config_service.get_active().id, "has_image_service")
+        rewritten = model_config_service.DEFAULT_CONFIGS.model_copy(deep=True)
+        rewritten.configs.append(
+            ModelConfig(
+                id="has_image_alt",
+                name="备用 HaS Image",
+                provider="local",
+                base_url="http://127.0.0.1:9081",
+                model_name="HaS-Image-YOLO11",
+            )
+        )
+        rewritten.active_id = "has_image_alt"
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(rewritten.model_dump_json())
+        # 保证 mtime 变化：同一时钟刻度内的两次写入 mtime 可能相同
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        self.assertEqual(model_config_service.get_active().id, "has_image_alt")
+        self.assertIsNotNone(model_config_service.get_config("has_image_alt"))
+
+    def test_mutating_loaded_configs_does_not_leak_into_cache(self):
+        loaded = model_config_service.load_configs()
+        loaded.configs.append(
+            ModelConfig(id="scratch", name="临时", provider="local", model_name="scratch")
+        )
+        loaded.configs.pop(0)
+        loaded.active_id = "scratch"
+
+        fresh = model_config_service.load_configs()
+        self.assertEqual(
+            [c.id for c in fresh.configs], [c.id for c in model_config_service.DEFAULT_CONFIGS.configs]
+        )
+        self.assertEqual(fresh.active_id, "has_image_service")
+        self.assertIsNone(model_config_service.get_config("scratch"))
+
+        # save_configs 缓存的是副本，保存后继续修改入参同样不影响缓存
+        to_save = model_config_service.load_configs()
+        model_config_service.save_configs(to_save)
+        to_save.configs.clear()
+        self.assertEqual(len(model_config_service.load_configs().configs), len(fresh.configs))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from enum import Enum
+from unittest import mock
+
+from pydantic import BaseModel
+
+from app.core import persistence
+
+
+class _Item(BaseModel):
+    name: str
+    tags: list[str]
+
+
+class _Kind(str, Enum):
+    TEXT = "text"
+
+
+_SAMPLE = {
+    "条目": _Item(name="张三", tags=["甲方"]),
+    1: [1, 2.5, None, True],
+    "kind": _Kind.TEXT,
+    "nested": {"pair": (1, 2)},
+}
+
+_EXPECTED = """{
+  "条目": {
+    "name": "张三",
+    "tags": [
+      "甲方"
+    ]
+  },
+  "1": [
+    1,
+    2.5,
+    null,
+    true
+  ],
+  "kind": "text",
+  "nested": {
+    "pair": [
+      1,
+      2
+    ]
+  }
+}"""
+
+
+class PersistenceJsonTests(unittest.TestCase):
+    """orjson 分支与标准库回退分支的输出必须逐字节一致。"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def _branches(self):
+        if persistence.orjson is not None:
+            yield "orjson", mock.patch.object(persistence, "orjson", persistence.orjson)
+        yield "stdlib", mock.patch.object(persistence, "orjson", None)
+
+    def test_dumps_pretty_matches_across_branches(self):
+        for name, patcher in self._branches():
+            with self.subTest(branch=name), patcher:
+                self.assertEqual(persistence.dumps_pretty(_SAMPLE).decode("utf-8"), _EXPECTED)
+
+    def test_dumps_pretty_falls_back_when_orjson_rejects_value(self):
+        # orjson 不支持超过 64 位的整数，应回退到标准库而不是抛错
+        for name, patcher in self._branches():
+            with self.subTest(branch=name), patcher:
+                self.assertEqual(persistence.dumps_pretty({"big": 2**70}), b'{\n  "big": 1180591620717411303424\n}')
+
+    def test_load_json_round_trip(self):
+        path = os.path.join(self.dir, "data.json")
+        for name, patcher in self._branches():
+            with self.subTest(branch=name), patcher:
+                self.assertTrue(persistence.save_json(path, _SAMPLE))
+                loaded = persistence.load_json(path)
+                self.assertEqual(loaded["条目"], {"name": "张三", "tags": ["甲方"]})
+                self.assertEqual(loaded["1"], [1, 2.5, None, True])
+                self.assertEqual(loaded["kind"], "text")
+
+    def test_load_json_returns_default_for_missing_or_corrupt_file(self):
+        path = os.path.join(self.dir, "broken.json")
+        with open(path, "wb") as f:
+            f.write(b'{"truncated": ')
+        for name, patcher in self._branches():
+            with self.subTest(branch=name), patcher:
+                self.assertEqual(persistence.load_json(path, default={}), {})
+                self.assertIsNone(persistence.load_json(os.path.join(self.dir, "missing.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.core.config import settings
+from app.services import pipeline_service as ps
+
+
+def _custom_type(type_id: str, **kwargs) -> ps.PipelineTypeConfig:
+    return ps.PipelineTypeConfig(id=type_id, name=type_id, **kwargs)
+
+
+def _dump(pipelines: dict) -> dict:
+    return {mode: pipeline.model_dump(mode="json") for mode, pipeline in pipelines.items()}
+
+
+class PipelineStoreTests(unittest.TestCase):
+    """快照 + 变更日志的持久化：每个用例都在临时目录里模拟一次进程启动。"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store_path = os.path.join(tmp.name, "pipelines.json")
+        patchers = [
+            mock.patch.object(settings, "PIPELINE_STORE_PATH", self.store_path),
+            mock.patch.multiple(
+                ps,
+                pipelines_db={},
+                types_index={},
+                _type_positions={},
+                _enabled_types={},
+                _version={},
+                _types_cache={},
+                _pipelines_json_cache={},
+                _types_json_cache={},
+                _db_version=0,
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self._boot()
+
+    def _boot(self, *, compact: bool = True) -> None:
+        """按模块导入时的顺序：读快照并重放日志、建索引、压缩。"""
+        ps.pipelines_db = ps._load_pipelines()
+        for index in (ps.types_index, ps._type_positions, ps._enabled_types):
+            index.clear()
+        ps._reindex()
+        if compact:
+            ps._compact()
+
+    def _mutate(self) -> None:
+        ps.toggle_pipeline("ocr_has")
+        ps.add_pipeline_type("vlm", _custom_type("custom_stamp"))
+        ps.add_pipeline_type("vlm", _custom_type("custom_logo"))
+        ps.toggle_pipeline_type("ocr_has", "PERSON")
+        ps.update_pipeline_type("vlm", "custom_stamp", _custom_type("custom_seal", order=5))
+        ps.delete_pipeline_type("vlm", "custom_logo")
+
+    def test_changes_replay_after_restart(self):
+        self._mutate()
+        self.assertTrue(os.path.exists(ps._log_path()))
+        expected = _dump(ps.pipelines_db)
+
+        self._boot()
+        self.assertEqual(_dump(ps.pipelines_db), expected)
+        self.assertFalse(os.path.exists(ps._log_path()))
+        # 压缩后的快照单独加载也一致
+        self._boot()
+        self.assertEqual(_dump(ps.pipelines_db), expected)
+
+    def test_replaying_log_over_its_own_snapshot_is_idempotent(self):
+        self._mutate()
+        expected = _dump(ps.pipelines_db)
+        # 模拟压缩中途崩溃：快照已写出，日志尚未删除
+        ps._write_pipelines()
+        self.assertTrue(os.path.exists(ps._log_path()))
+
+        self._boot(compact=False)
+        self.assertEqual(_dump(ps.pipelines_db), expected)
+        self._boot()
+        self.assertEqual(_dump(ps.pipelines_db), expected)
+
+    def test_put_type_with_replaces_keeps_position(self):
+        ps.add_pipeline_type("vlm", _custom_type("custom_a"))
+        ps.add_pipeline_type("vlm", _custom_type("custom_b"))
+        ps.update_pipeline_type("vlm", "custom_a", _custom_type("custom_a2", color="#000000"))
+        ids = [t.id for t in ps.pipelines_db["vlm"].types]
+        self.assertEqual(ids[-2:], ["custom_a2", "custom_b"])
+
+        expected = _dump(ps.pipelines_db)
+        ps._write_pipelines()
+        self._boot(compact=False)
+        self.assertEqual(_dump(ps.pipelines_db), expected)
+
+    def test_rename_onto_existing_id_is_rejected(self):
+        ps.add_pipeline_type("vlm", _custom_type("custom_a"))
+        ps.add_pipeline_type("vlm", _custom_type("custom_b", color="#111111"))
+        preset_id = ps.PRESET_PIPELINES["vlm"].types[0].id
+        before = _dump(ps.pipelines_db)
+
+        for target in ("custom_b", preset_id):
+            with self.subTest(target=target):
+                updated, error = ps.update_pipeline_type("vlm", "custom_a", _custom_type(target))
+                self.assertIsNone(updated)
+                self.assertEqual(error, "类型 ID 已存在")
+                self.assertEqual(_dump(ps.pipelines_db), before)
+
+        # 不改 ID 的更新不受影响
+        updated, error = ps.update_pipeline_type("vlm", "custom_b", _custom_type("custom_b", color="#222222"))
+        self.assertEqual(error, "")
+        self.assertEqual(ps.types_index["vlm"]["custom_b"].color, "#222222")
+        self.assertIn("custom_a", ps.types_index["vlm"])
+
+    def test_truncated_last_log_line_is_skipped(self):
+        ps.toggle_pipeline("vlm")
+        ps.add_pipeline_type("vlm", _custom_type("custom_kept"))
+        with open(ps._log_path(), "ab") as f:
+            f.write(b'{"op": "delete_type", "mode": "vlm", "id": "custom_ke')
+        expected = _dump(ps.pipelines_db)
+
+        self._boot()
+        self.assertEqual(_dump(ps.pipelines_db), expected)
+        self.assertIn("custom_kept", ps.types_index["vlm"])
+        # 启动压缩后日志从空开始，之后的追加不会接在半行后面
+        ps.toggle_pipeline_type("vlm", "custom_kept")
+        self._boot(compact=False)
+        self.assertFalse(ps.types_index["vlm"]["custom_kept"].enabled)
+
+    def test_log_is_compacted_past_threshold(self):
+        with mock.patch.object(ps, "_LOG_COMPACT_BYTES", 512):
+            for _ in range(3):
+                ps.toggle_pipeline("ocr_has")
+            self.assertTrue(os.path.exists(ps._log_path()))
+            ps.add_pipeline_type("vlm", _custom_type("custom_big", description="x" * 600))
+            self.assertFalse(os.path.exists(ps._log_path()))
+
+        with open(self.store_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        self.assertFalse(snapshot["ocr_has"]["enabled"])
+        self.assertIn("custom_big", [t["id"] for t in snapshot["vlm"]["types"]])
+        expected = _dump(ps.pipelines_db)
+        self._boot()
+        self.assertEqual(_dump(ps.pipelines_db), expected)
+
+    def test_type_positions_follow_list_order_with_duplicate_ids(self):
+        vlm = ps.PRESET_PIPELINES["vlm"].model_dump(mode="json")
+        vlm["types"] += [
+            _custom_type(type_id).model_dump(mode="json") for type_id in ("custom_dup", "custom_dup", "custom_last")
+        ]
+        with open(self.store_path, "w", encoding="utf-8") as f:
+            json.dump({"vlm": vlm}, f)
+        self._boot(compact=False)
+
+        ids = [t.id for t in ps.pipelines_db["vlm"].types]
+        self.assertEqual(ps._type_positions["vlm"], {type_id: i for i, type_id in enumerate(ids)})
+        ps.toggle_pipeline_type("vlm", "custom_last")
+        self.assertEqual(
+            [(t.id, t.enabled) for t in ps.pipelines_db["vlm"].types[-3:]],
+            [("custom_dup", True), ("custom_dup", True), ("custom_last", False)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import redaction
+
+
+class StaticReferenceListTests(unittest.TestCase):
+    def test_reference_lists_are_only_privately_cacheable(self):
+        # 这些路由在鉴权之后，共享缓存（代理/CDN）不能存储响应
+        app = FastAPI()
+        app.include_router(redaction.router, prefix="/api")
+        client = TestClient(app)
+        for path in ("/api/redaction/entity-types", "/api/redaction/replacement-modes"):
+            with self.subTest(path=path):
+                resp = client.get(path)
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(resp.headers["cache-control"], "private, max-age=3600")
+
+
+if __name__ == "__main__":
+    unittest.main()
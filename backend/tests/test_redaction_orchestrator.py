@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from app.models.schemas import VisionResult
+from app.services import pipeline_service, redaction_orchestrator
+
+
+class DetectVisionCoalescingTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.calls = []
+        self.release = asyncio.Event()
+
+        async def fake_detect_vision(**kwargs):
+            self.calls.append(kwargs)
+            await self.release.wait()
+            status = "force_refresh" if kwargs["force"] else "miss"
+            return VisionResult(
+                file_id=kwargs["file_id"],
+                page=kwargs["page"],
+                bounding_boxes=[],
+                cache_status={"vision_result": status, "force": kwargs["force"]},
+            )
+
+        patcher = mock.patch.object(redaction_orchestrator, "_detect_vision", fake_detect_vision)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _run_concurrently(self, *calls):
+        tasks = [asyncio.ensure_future(call) for call in calls]
+        await asyncio.sleep(0)  # 让所有请求都进入等待
+        self.release.set()
+        return await asyncio.gather(*tasks)
+
+    async def test_identical_concurrent_calls_run_pipeline_once(self):
+        leader, follower = await self._run_concurrently(
+            redaction_orchestrator.detect_vision("f1", page=2, selected_ocr_has_types=["PERSON"]),
+            redaction_orchestrator.detect_vision("f1", page=2, selected_ocr_has_types=["PERSON"]),
+        )
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(leader.cache_status["vision_result"], "miss")
+        self.assertEqual(follower.cache_status["vision_result"], "coalesced")
+        self.assertEqual(follower.page, 2)
+        # 后到者拿到的是副本，改写 cache_status 不影响先到者的结果
+        self.assertIsNot(follower, leader)
+        self.assertEqual(redaction_orchestrator._inflight_vision, {})
+
+    async def test_different_parameters_are_not_coalesced(self):
+        await self._run_concurrently(
+            redaction_orchestrator.detect_vision("f1", page=1),
+            redaction_orchestrator.detect_vision("f1", page=2),
+            redaction_orchestrator.detect_vision("f1", page=1, selected_vlm_types=["signature"]),
+        )
+        self.assertEqual(len(self.calls), 3)
+
+    async def test_force_bypasses_coalescing(self):
+        results = await self._run_concurrently(
+            redaction_orchestrator.detect_vision("f1", page=1),
+            redaction_orchestrator.detect_vision("f1", page=1, force=True),
+            redaction_orchestrator.detect_vision("f1", page=1, force=True),
+        )
+
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual([r.cache_status["vision_result"] for r in results], ["miss", "force_refresh", "force_refresh"])
+
+
+
+class _FileStore(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+class DetectVisionNoPipelineTests(unittest.IsolatedAsyncioTestCase):
+    async def test_all_pipelines_disabled_skips_vision_service(self):
+        # 文件路径不存在：若误走了页面读取/渲染会直接报错
+        file_store = _FileStore(f1={"file_path": "/nonexistent/page.png", "file_type": "image"})
+        disabled = {
+            mode: pipeline.model_copy(update={"enabled": False})
+            for mode, pipeline in pipeline_service.pipelines_db.items()
+        }
+        vision_service_cls = mock.Mock(side_effect=AssertionError("VisionService must not be built"))
+        with (
+            mock.patch.object(pipeline_service, "pipelines_db", disabled),
+            mock.patch.object(redaction_orchestrator, "_get_file_store", return_value=file_store),
+            mock.patch.object(redaction_orchestrator, "_get_file_store_lock", return_value=asyncio.Lock()),
+            mock.patch.object(redaction_orchestrator, "VisionService", vision_service_cls),
+            mock.patch.object(redaction_orchestrator, "get_vision_service", vision_service_cls),
+        ):
+            result = await redaction_orchestrator._detect_vision(
+                "f1", page=1, selected_vlm_types=["signature"], force=True
+            )
+
+        vision_service_cls.assert_not_called()
+        self.assertIsNone(result.result_image)
+        self.assertEqual(result.bounding_boxes, [])
+        self.assertEqual(set(result.pipeline_status), {"ocr_has", "has_image", "vlm"})
+        for status in result.pipeline_status.values():
+            self.assertTrue(status["skipped"])
+            self.assertFalse(status["ran"])
+        self.assertIn(1, file_store["f1"]["vision_quality"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import random
+import unittest
+from unittest import mock
+
+import httpx
+
+from app.core import retry
+from app.core.retry import RETRYABLE_HTTPX, is_transient_http_error, retry_async, retry_sync
+
+_RETRY_ARGS = {
+    "max_retries": 2,
+    "base_delay": 0.5,
+    "max_delay": 8.0,
+    "retryable_exceptions": (*RETRYABLE_HTTPX, httpx.HTTPStatusError),
+    "retry_if": is_transient_http_error,
+    "jitter": True,
+}
+
+
+def _status_error(status: int, body: str = "") -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://vlm.local/v1/chat/completions")
+    response = httpx.Response(status, text=body, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+def _failing(*errors):
+    """依次抛出 errors，之后返回 "ok"；calls 记录调用次数。"""
+    remaining = list(errors)
+
+    def fn():
+        fn.calls += 1
+        if remaining:
+            raise remaining.pop(0)
+        return "ok"
+
+    fn.calls = 0
+    return fn
+
+
+class RetryTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(retry.asyncio, "sleep", mock.AsyncMock())
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_rate_limit_and_unavailable_are_retried(self):
+        for status in (429, 503):
+            with self.subTest(status=status):
+                fn = _failing(_status_error(status), _status_error(status))
+
+                async def call(fn=fn):
+                    return fn()
+
+                self.assertEqual(await retry_async(call, **_RETRY_ARGS), "ok")
+                self.assertEqual(fn.calls, 3)
+
+    async def test_other_client_errors_fail_immediately(self):
+        for status in (400, 401, 404, 422):
+            with self.subTest(status=status):
+                fn = _failing(_status_error(status, "bad request"))
+
+                async def call(fn=fn):
+                    return fn()
+
+                with self.assertRaises(httpx.HTTPStatusError):
+                    await retry_async(call, **_RETRY_ARGS)
+                self.assertEqual(fn.calls, 1)
+        self.sleep.assert_not_awaited()
+
+    async def test_rate_limit_message_in_body_is_retried(self):
+        fn = _failing(_status_error(400, '{"error": "Too Many Requests"}'))
+
+        async def call():
+            return fn()
+
+        self.assertEqual(await retry_async(call, **_RETRY_ARGS), "ok")
+        self.assertEqual(fn.calls, 2)
+
+    async def test_connection_errors_are_retried_until_exhausted(self):
+        fn = _failing(*[httpx.ConnectError("refused")] * 3)
+
+        async def call():
+            return fn()
+
+        with self.assertRaises(httpx.ConnectError):
+            await retry_async(call, **_RETRY_ARGS)
+        self.assertEqual(fn.calls, 3)
+
+    def test_jitter_stays_within_zero_and_capped_delay(self):
+        rng = random.Random(7)
+        with mock.patch.object(retry.random, "uniform", rng.uniform):
+            for attempt in range(8):
+                cap = min(0.5 * 2**attempt, 8.0)
+                delays = [retry._backoff_delay(attempt, 0.5, 8.0, jitter=True) for _ in range(200)]
+                self.assertTrue(all(0 <= d <= cap for d in delays), (attempt, min(delays), max(delays)))
+                # 真的在抖动，而不是固定取某个值
+                self.assertGreater(len(set(delays)), 1)
+                self.assertEqual(retry._backoff_delay(attempt, 0.5, 8.0, jitter=False), cap)
+
+    def test_retry_sync_sleeps_jittered_delays(self):
+        fn = _failing(_status_error(503), _status_error(503))
+        with mock.patch("time.sleep") as sleep:
+            self.assertEqual(retry_sync(fn, **_RETRY_ARGS), "ok")
+        delays = [c.args[0] for c in sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0 <= delays[0] <= 0.5 and 0 <= delays[1] <= 1.0, delays)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import functools
+import re
+import threading
+import time
+import unittest
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from unittest import mock
+
+from app.core import safe_regex
+
+
+class SafeRegexPoolTests(unittest.TestCase):
+    def setUp(self):
+        # 两个工作进程：一个跑正常请求，一个被卡住的调用占用
+        patcher = mock.patch.multiple(safe_regex, _POOL_WORKERS=2, _pool=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: safe_regex._pool and safe_regex._pool.shutdown(wait=False))
+
+    def test_timeout_does_not_cancel_other_inflight_calls(self):
+        safe_regex.safe_search(re.compile("a"), "a")  # 预热，避免把进程启动时间算进超时
+
+        slow = re.compile(r"\d+x")
+        slow_text = "1" * 15000  # 没有 x：\d+ 逐个起点回溯，约一秒
+        quick = [re.compile("b+"), re.compile("c")]
+        results = {}
+        old_pool = safe_regex._get_pool()
+
+        def run_slow():
+            results["slow"] = safe_regex.safe_finditer(slow, slow_text, timeout=30)
+
+        def run_stuck():
+            with self.assertRaises(FuturesTimeoutError):
+                safe_regex._run_in_pool(time.sleep, 2, timeout=0.3)
+
+        def run_queued(n):
+            if n % 2:
+                results[n] = safe_regex.safe_finditer_many(quick, "abbc", timeout=30)
+            else:
+                results[n] = [safe_regex.safe_finditer(compiled, "abbc", timeout=30) for compiled in quick]
+
+        # 排队的调用多于进程池预取的调用数，超时发生时它们仍在队列里
+        queued = [functools.partial(run_queued, n) for n in range(4)]
+        threads = [threading.Thread(target=fn) for fn in (run_slow, run_stuck, *queued)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join(timeout=60)
+
+        self.assertIsNot(safe_regex._get_pool(), old_pool)
+        self.assertEqual(results["slow"], [])
+        for n in range(4):
+            self.assertEqual(
+                [[(m.group(), m.start(), m.end()) for m in found] for found in results[n]],
+                [[("bb", 1, 3)], [("c", 3, 4)]],
+            )
+        # 退役后的调用落到新池上
+        self.assertTrue(safe_regex.safe_search(re.compile("z"), "xyz"))
+
+
+if __name__ == "__main__":
+    unittest.main()